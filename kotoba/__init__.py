@@ -5,18 +5,20 @@ import re
 from xml.dom.minidom   import parse, parseString
 
 from .common    import is_string
-from .driver    import JSONDriver, XMLDriver
-from .kotoba    import Kotoba
+from .driver    import JSONDriver, MappedJSONDriver, XMLDriver, xml_driver
+from .kotoba    import EagerKotoba, Kotoba
+from .          import snapshot
+from .columnar  import ColumnarDocument, MappedJSONDocument
+from .profiler  import profile
+from .stream    import JSONLinesStream, XMLStream
 from .exception import *
 
-__all__ = ['Kotoba', 'load_from_file']
+__all__ = ['Kotoba', 'JSONLinesStream', 'XMLStream', 'load_from_file', 'profile']
 
 __version__ = (3, 2, 0)
 
-def __load_xml(file_path):
-    domDocument = parse(file_path)
-
-    return XMLDriver(domDocument.documentElement)
+def __load_xml(file_path, driver='minidom'):
+    return xml_driver(driver).from_file(file_path)
 
 def __load_json(file_path):
     with codecs.open(file_path) as f:
@@ -24,13 +26,45 @@ def __load_json(file_path):
 
     return JSONDriver(obj, 'root')
 
-def load_from_file(file_path):
+def load_from_file(file_path, mode='dom', driver='minidom', workers=0, cache=False, cache_dir=None, only=None, eager=False):
     """
     Load from the *filename*.
 
     :param file_path: the location of the data.
+    :param mode: ``dom`` (default) to load the whole document, ``stream``
+                 to query an XML document while it is being read, ``mmap``
+                 to memory-map and index a JSON document and decode it on
+                 demand (see :class:`kotoba.columnar.MappedJSONDocument`), or
+                 ``columnar`` to store a large read-only XML document in
+                 arrays (see :class:`kotoba.columnar.ColumnarDocument`).
+    :param driver: the XML driver in ``dom`` mode, ``minidom`` (default) or
+                   ``etree`` for the faster :mod:`xml.etree.ElementTree`.
+    :param workers: the number of processes decoding a JSON Lines document
+                    (see :class:`kotoba.stream.JSONLinesStream`).
+    :param cache: whether to keep a parsed snapshot of an XML document on disk
+                  and load it instead while the file is unchanged (``dom``
+                  and ``columnar`` modes only, see :func:`kotoba.snapshot.load`).
+    :param cache_dir: the directory of the snapshots (default: ``kotoba`` in
+                      the cache directory of the user, see
+                      :func:`kotoba.snapshot.default_cache_dir`).
+    :param only: a selector to load only the elements of an XML document
+                 which it can match, with their ancestors (``dom`` mode with
+                 the ``minidom`` driver, see :meth:`kotoba.stream.XMLStream.load`).
+    :param eager: whether to build the whole tree at once and release the
+                  source document (see :class:`kotoba.kotoba.EagerKotoba`).
 
     :return: :class `kotoba.kotoba.Kotoba`: if the parser can parse the data.
+             :class `kotoba.stream.XMLStream`: in ``stream`` mode.
+             :class `kotoba.columnar.NodeView`: of the document element in
+             ``columnar`` mode.
+             :class `kotoba.columnar.MappedJSONView`: of the top-level value in
+             ``mmap`` mode (without *eager*).
+             :class `kotoba.stream.JSONLinesStream`: for JSON Lines documents
+             (``.jsonl`` or ``.ndjson``), which are always streamed.
+
+    .. versionchanged:: 3.3
+       Added *mode*, *driver*, *workers*, *cache*, *cache_dir*, *only* and
+       *eager*, and JSON Lines documents.
     """
     if not os.path.exists(file_path):
         raise InvalidDataSourceError('The path {} is not found.'.format(file_path))
@@ -38,8 +72,61 @@ def load_from_file(file_path):
     if os.path.isdir(file_path):
         raise InvalidDataSourceError('The path {} is not a file.'.format(file_path))
 
+    if mode not in ('dom', 'stream', 'mmap', 'columnar'):
+        raise InvalidInputError('The mode {} is not supported.'.format(mode))
+
+    if cache and (mode not in ('dom', 'columnar') or re.search(r'\.(json|jsonl|ndjson)$', file_path, re.I)):
+        raise InvalidInputError('The cache only supports XML documents in dom or columnar mode.')
+
+    if only is not None and (mode != 'dom' or cache or driver != 'minidom' or re.search(r'\.(json|jsonl|ndjson)$', file_path, re.I)):
+        raise InvalidInputError('The partial loading only supports XML documents in dom mode with the minidom driver.')
+
+    if re.search(r'\.(jsonl|ndjson)$', file_path, re.I):
+        if mode == 'mmap':
+            raise InvalidInputError('The mmap mode does not support JSON Lines documents.')
+
+        if eager:
+            raise InvalidInputError('JSON Lines documents are always streamed.')
+
+        return JSONLinesStream(file_path, workers)
+
+    if mode == 'stream':
+        if re.search(r'\.json$', file_path, re.I):
+            raise InvalidInputError('The stream mode only supports XML documents.')
+
+        if eager:
+            raise InvalidInputError('The stream mode does not build trees.')
+
+        return XMLStream(file_path)
+
+    if mode == 'columnar':
+        if eager or only is not None or re.search(r'\.json$', file_path, re.I):
+            raise InvalidInputError('The columnar mode only supports XML documents, without eager or partial loading.')
+
+        if cache:
+            return ColumnarDocument(snapshot.load_snapshot(file_path, driver, cache_dir)).root()
+
+        return ColumnarDocument.from_file(file_path).root()
+
     if re.search(r'\.json$', file_path, re.I):
-        return Kotoba(__load_json(file_path))
+        if mode == 'mmap' and not eager:
+            return MappedJSONDocument.from_file(file_path).root()
+
+        if mode == 'mmap':
+            document = Kotoba(MappedJSONDriver.from_file(file_path))
+        else:
+            document = Kotoba(__load_json(file_path))
+    elif mode == 'mmap':
+        raise InvalidInputError('The mmap mode only supports JSON documents.')
+    elif only is not None:
+        document = XMLStream(file_path).load(only)
+    elif cache:
+        document = snapshot.load(file_path, driver, cache_dir)
+    else: # default to XML
+        document = Kotoba(__load_xml(file_path, driver))
+
+    if eager:
+        # The lazy root has not loaded anything yet, so only its driver is kept.
+        return EagerKotoba.build(document.node())
 
-    # default to XML
-    return Kotoba(__load_xml(file_path))
+    return document
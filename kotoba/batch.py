@@ -0,0 +1,89 @@
+from collections     import namedtuple
+from multiprocessing import Pool
+
+from .common    import is_string
+from .exception import *
+
+__all__ = ['BatchResult', 'query']
+
+BatchResult = namedtuple('BatchResult', ['path', 'matches', 'error'])
+BatchResult.__doc__ = '''
+Result of the queries on one file
+
+*matches* maps each selector key to the list of the matching nodes, each as a
+dictionary of its ``name``, ``attributes`` and ``data``. When the file cannot be
+loaded or queried, *matches* is ``None`` and *error* is the
+:class:`kotoba.exception.InvalidDataSourceError` describing the failure.
+
+.. versionadded:: 3.3
+'''
+
+def query(paths, selectors, workers=None, ordered=True, chunksize=1, driver='minidom'):
+    """
+    Load and query many files in a pool of processes.
+
+    :param paths:     the iterable of the locations of the files.
+    :param selectors: a selector, a list of selectors, or a dictionary from the
+                      key of each result to a selector.
+    :param workers:   the number of processes (default: the number of CPUs).
+                      With ``0``, the files are queried in this process.
+    :param ordered:   whether the results follow the order of *paths*. Otherwise,
+                      they come as soon as they are ready.
+    :param chunksize: the number of files sent to a process at once.
+    :param driver:    the XML driver (see :func:`kotoba.load_from_file`).
+
+    :return: the iterator of :class:`BatchResult`, one per file, while the
+             files are being processed. As :class:`kotoba.kotoba.Kotoba` trees
+             stay in the processes, only the extracted data is returned.
+
+    .. versionadded:: 3.3
+    """
+    if is_string(selectors):
+        selectors = [selectors]
+
+    if not isinstance(selectors, dict):
+        selectors = {selector: selector for selector in selectors}
+
+    if not selectors:
+        raise InvalidInputError('At least one selector is required.')
+
+    for key, selector in selectors.items():
+        if not is_string(selector):
+            raise InvalidInputError('The selector for {} is not a string.'.format(key))
+
+    return _iterate(((path, selectors, driver) for path in paths), workers, ordered, chunksize)
+
+def _iterate(tasks, workers, ordered, chunksize):
+    if workers == 0:
+        for task in tasks:
+            yield _query_file(task)
+
+        return
+
+    with Pool(workers) as pool:
+        results = pool.imap(_query_file, tasks, chunksize) if ordered else pool.imap_unordered(_query_file, tasks, chunksize)
+
+        for result in results:
+            yield result
+
+def _query_file(task):
+    from . import load_from_file # The package imports this module.
+
+    path, selectors, driver = task
+
+    try:
+        document = load_from_file(path, driver=driver)
+        matches  = {
+            key: [
+                {'name': node.name(), 'attributes': dict(node.attributes()), 'data': node.data()}
+                for node in document.find(selector)
+            ]
+            for key, selector in selectors.items()
+        }
+    except Exception as e:
+        if not isinstance(e, InvalidDataSourceError):
+            e = InvalidDataSourceError('{}: {}: {}'.format(path, type(e).__name__, e))
+
+        return BatchResult(path, None, e)
+
+    return BatchResult(path, matches, None)
@@ -0,0 +1,506 @@
+from array       import array
+from xml.parsers import expat
+
+from .common    import is_string
+from .exception import *
+from .jsonmap   import JSONMap
+from .kami      import Kami
+from .parser    import compile_selector
+from .selector  import PathType, match_ancestors
+from .snapshot  import DATA, ELEMENT, OTHER, Snapshot, SnapshotWriter
+
+__all__ = ['ColumnarDocument', 'MappedJSONDocument', 'MappedJSONView', 'NodeView']
+
+class ColumnarDocument(object):
+    """
+    Read-only XML document stored in parallel arrays
+
+    :param kotoba.snapshot.Snapshot snapshot: the arrays of the document.
+
+    The nodes are numbered in document order, so the descendants of a node
+    are the nodes between its index and the index of its last descendant.
+    Each node takes a few tens of bytes in the arrays (kind, parent, first
+    child, next sibling, last descendant, name, value and attribute range),
+    and the names, the attributes and the text are interned in one buffer.
+    The nodes are only wrapped into :class:`NodeView` objects when they are
+    returned.
+
+    The nodes are the same as with the ``minidom`` driver, i.e., elements,
+    text and CDATA sections, and processing instructions.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot        = snapshot
+        self._name_ids       = None # name -> string ID, built on the first search
+
+        # by node: the positions among the elements of the parent and among
+        # the ones with the same name, and the previous element, and by
+        # parent: the number of elements, computed on the first use
+        self._positions         = None
+        self._type_positions    = None
+        self._previous_elements = None
+        self._element_counts    = None
+
+    @classmethod
+    def from_file(cls, file_path):
+        """ Parse the XML file straight into the arrays """
+        builder = _Builder()
+
+        with open(file_path, 'rb') as f:
+            try:
+                builder.parser.ParseFile(f)
+            except expat.ExpatError as e:
+                raise InvalidDataSourceError('{}: {}'.format(file_path, e))
+
+        return cls(Snapshot(builder.finish()))
+
+    @classmethod
+    def from_string(cls, content):
+        """ Parse the XML content straight into the arrays """
+        builder = _Builder()
+
+        try:
+            builder.parser.Parse(content, True)
+        except expat.ExpatError as e:
+            raise InvalidDataSourceError(str(e))
+
+        return cls(Snapshot(builder.finish()))
+
+    def root(self):
+        """ Get the view of the document element """
+        return NodeView(self, 0)
+
+    def size(self):
+        """ Get the number of nodes """
+        return self.snapshot.size
+
+    def name_ids(self, name):
+        """ Get the IDs in :attr:`snapshot.names` standing for the element *name*, if any """
+        if self._name_ids is None:
+            snapshot = self.snapshot
+
+            self._name_ids = {snapshot.string(string_id): string_id for string_id in set(snapshot.names)}
+
+        name_id = self._name_ids.get(name)
+
+        return () if name_id is None else (name_id,)
+
+    def position(self, index):
+        if self._positions is None:
+            self._count_positions()
+
+        return self._positions[index]
+
+    def type_position(self, index):
+        if self._type_positions is None:
+            self._count_positions()
+
+        return self._type_positions[index]
+
+    def previous_element(self, index):
+        """ Get the index of the previous element sibling, or ``-1`` """
+        if self._previous_elements is None:
+            self._count_positions()
+
+        return self._previous_elements[index]
+
+    def element_count(self, index):
+        """ Get the number of elements among the children """
+        if self._element_counts is None:
+            self._count_positions()
+
+        return self._element_counts[index]
+
+    def _count_positions(self):
+        # All arrays are filled at once, one list of children after the other.
+        snapshot          = self.snapshot
+        kinds, names      = snapshot.kinds, snapshot.names
+        size              = snapshot.size
+        positions         = array('i', bytes(4 * size))
+        type_positions    = array('i', bytes(4 * size))
+        previous_elements = array('i', [-1]) * size
+        element_counts    = array('i', bytes(4 * size))
+
+        for parent in range(size):
+            if kinds[parent] != ELEMENT:
+                continue
+
+            count    = 0
+            previous = -1
+            counts   = {}
+
+            for index in snapshot.children(parent):
+                if kinds[index] != ELEMENT:
+                    continue
+
+                name     = names[index]
+                position = counts.get(name, 0)
+
+                positions[index]         = count
+                type_positions[index]    = position
+                previous_elements[index] = previous
+
+                counts[name] = position + 1
+                count       += 1
+                previous     = index
+
+            element_counts[parent] = count
+
+        self._positions         = positions
+        self._type_positions    = type_positions
+        self._previous_elements = previous_elements
+        self._element_counts    = element_counts
+
+class NodeView(object):
+    """
+    View of a node of a :class:`ColumnarDocument`
+
+    Views are created on demand and only hold the document and the index of
+    the node, so two views of the same node are equal without being the same
+    object. They provide the reading methods of :class:`kotoba.kotoba.Kotoba`.
+
+    .. versionadded:: 3.3
+    """
+
+    __slots__ = ('_document', '_index')
+
+    def __init__(self, document, index):
+        self._document = document
+        self._index    = index
+
+    @property
+    def _guid(self):
+        # The de-duplication in Kami and the memos of the matching use it, so it
+        # is unique across the documents and never clashes with the integer GUIDs
+        # of Kotoba nodes. The view keeps the document alive, so is its ID.
+        return (id(self._document), self._index)
+
+    def guid(self):
+        return self._guid
+
+    def document(self):
+        return self._document
+
+    def name(self):
+        return self._document.snapshot.name(self._index)
+
+    def level(self):
+        parents = self._document.snapshot.parents
+        level   = 0
+        index   = parents[self._index]
+
+        while index >= 0:
+            level += 1
+            index  = parents[index]
+
+        return level
+
+    def parent(self):
+        parent = self._document.snapshot.parents[self._index]
+
+        return None if parent < 0 else self.__class__(self._document, parent)
+
+    def position(self):
+        return self._document.position(self._index)
+
+    def type_position(self):
+        return self._document.type_position(self._index)
+
+    def previous_element(self):
+        previous = self._document.previous_element(self._index)
+
+        return None if previous < 0 else self.__class__(self._document, previous)
+
+    def sibling_count(self):
+        parent = self._document.snapshot.parents[self._index]
+
+        return 1 if parent < 0 else self._document.element_count(parent)
+
+    def attributes(self):
+        return self._document.snapshot.attributes(self._index)
+
+    def attribute(self, key):
+        return self._document.snapshot.attribute(self._index, key)
+
+    def has_attribute(self, key):
+        return self.attribute(key) is not None
+
+    def is_element(self):
+        return self._document.snapshot.kinds[self._index] == ELEMENT
+
+    def is_comment(self):
+        return False
+
+    def is_data(self):
+        return self._document.snapshot.kinds[self._index] == DATA
+
+    def original_value(self):
+        return self._document.snapshot.value(self._index)
+
+    def children(self, selector=None, include_data_blocks=False):
+        snapshot  = self._document.snapshot
+        kinds     = snapshot.kinds
+        returnees = Kami()
+        nodes     = [
+            self.__class__(self._document, index)
+            for index in snapshot.children(self._index)
+            if include_data_blocks or kinds[index] == ELEMENT
+        ]
+
+        if is_string(selector):
+            selector = compile_selector(selector)
+
+        if selector and not include_data_blocks:
+            chain = selector.chain()
+            last  = chain[-1]
+            memo  = {}
+            nodes = [node for node in nodes if last.match(node) and match_ancestors(chain, node, [], memo)]
+
+        list.extend(returnees, nodes) # unique by construction
+
+        return returnees
+
+    def find(self, selector):
+        """ Find the descendants matching the *selector* in document order
+
+            The descendants are scanned as a range of indexes, testing the
+            kind and the interned name before anything is wrapped, then the
+            rest of the chain is checked from right to left.
+        """
+        if is_string(selector):
+            selector = compile_selector(selector)
+
+        if not selector:
+            raise InvalidSelectorError()
+
+        if selector.kind() in (PathType.any_siblings, PathType.immediate_siblings):
+            raise InvalidSelectorError('The selector cannot start with a sibling combinator.')
+
+        document = self._document
+        snapshot = document.snapshot
+        kinds    = snapshot.kinds
+        names    = snapshot.names
+        parents  = snapshot.parents
+        chain    = selector.chain()
+        last     = chain[-1]
+        context  = self._index
+        memo     = {}
+        found    = []
+
+        view     = self.__class__
+
+        if last.name() in last.wildcards:
+            name_ids = None
+        else:
+            name_ids = document.name_ids(last.name())
+
+            if not name_ids:
+                return Kami()
+
+        for index in range(context + 1, snapshot.ends[context] + 1):
+            if kinds[index] != ELEMENT or (name_ids is not None and names[index] not in name_ids):
+                continue
+
+            node = view(document, index)
+
+            if not last.match(node):
+                continue
+
+            lineage = []
+            parent  = parents[index]
+
+            while parent != context:
+                lineage.append(view(document, parent))
+
+                parent = parents[parent]
+
+            lineage.reverse()
+
+            if match_ancestors(chain, node, lineage, memo):
+                found.append(node)
+
+        returnees = Kami()
+
+        list.extend(returnees, found) # unique by construction
+
+        return returnees
+
+    def data(self, max_chars=None):
+        """ Join the data blocks under the node, which are stored contiguously """
+        snapshot = self._document.snapshot
+        kinds    = snapshot.kinds
+        values   = snapshot.values
+        blocks   = []
+        length   = 0
+
+        for index in range(self._index + 1, snapshot.ends[self._index] + 1):
+            if kinds[index] != DATA:
+                continue
+
+            block = snapshot.string(values[index])
+
+            blocks.append(block)
+
+            length += len(block)
+
+            if max_chars is not None and length >= max_chars:
+                break
+
+        data = ''.join(blocks)
+
+        return data if max_chars is None else data[:max_chars]
+
+    def iter_text(self):
+        snapshot = self._document.snapshot
+        kinds    = snapshot.kinds
+
+        for index in range(self._index + 1, snapshot.ends[self._index] + 1):
+            if kinds[index] == DATA:
+                yield snapshot.value(index)
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other._document is self._document and other._index == self._index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._guid)
+
+    def __repr__(self):
+        return '<{}:{}>'.format(self.__class__.__name__, self.name())
+
+class MappedJSONDocument(ColumnarDocument):
+    """
+    Read-only JSON document read through its structural index
+
+    :param kotoba.jsonmap.JSONMap json_map: the index of the document, which
+                                            stands for the snapshot.
+
+    The nodes are the values, named after their keys or their positions, as
+    with :class:`kotoba.driver.JSONDriver`. They are :class:`MappedJSONView`
+    objects created on demand, and the values are decoded from the buffer
+    when they are read, so the resident memory is the index and whatever the
+    caller keeps.
+
+    .. versionadded:: 3.3
+    """
+
+    @classmethod
+    def from_file(cls, file_path):
+        """ Map the JSON file and index it """
+        return cls(JSONMap.from_file(file_path))
+
+    @classmethod
+    def from_string(cls, content):
+        """ Index the JSON content """
+        return cls(JSONMap(content.encode('utf-8') if is_string(content) else content))
+
+    def root(self):
+        return MappedJSONView(self, 0)
+
+    def name_ids(self, name):
+        # A digit name may be a key as well as a position in an array.
+        key_id   = self.snapshot.key_id(name)
+        name_ids = () if key_id is None else (key_id,)
+
+        if name.isdigit() and str(int(name)) == name:
+            name_ids += (-1 - int(name),)
+
+        return name_ids
+
+class MappedJSONView(NodeView):
+    """
+    View of a value of a :class:`MappedJSONDocument`
+
+    Every value is an element. The scalars and the empty objects and arrays
+    are data blocks as well, whose data is the decoded value.
+
+    .. versionadded:: 3.3
+    """
+
+    __slots__ = ()
+
+    def is_data(self):
+        return not self._document.snapshot.is_iterable(self._index)
+
+    def data(self, max_chars=None):
+        value = self.original_value()
+
+        return value[:max_chars] if max_chars is not None and is_string(value) else value
+
+    def iter_text(self):
+        snapshot = self._document.snapshot
+
+        for index in range(self._index + 1, snapshot.ends[self._index] + 1):
+            if not snapshot.is_iterable(index):
+                yield snapshot.value(index)
+
+class _Builder(object):
+    """ Feed the events of expat into a :class:`kotoba.snapshot.SnapshotWriter`
+
+        The nodes follow the ``minidom`` driver: consecutive character data is
+        one text node, CDATA sections are separate nodes, and comments are
+        dropped (while still separating the text around them).
+    """
+
+    def __init__(self):
+        self.writer = SnapshotWriter()
+        self.parser = expat.ParserCreate()
+        self._text  = []
+        self._cdata = False
+
+        self.parser.buffer_text                  = True
+        self.parser.StartElementHandler          = self._start_element
+        self.parser.EndElementHandler            = self._end_element
+        self.parser.CharacterDataHandler         = self._text.append
+        self.parser.StartCdataSectionHandler     = self._start_cdata
+        self.parser.EndCdataSectionHandler       = self._end_cdata
+        self.parser.CommentHandler               = self._comment
+        self.parser.ProcessingInstructionHandler = self._processing_instruction
+
+    def finish(self):
+        if not self.writer.size():
+            raise InvalidDataSourceError('The document has no elements.')
+
+        return self.writer.finish()
+
+    def _flush(self):
+        if not self._text:
+            return
+
+        value = ''.join(self._text)
+
+        del self._text[:]
+
+        if value and self.writer.depth():
+            self.writer.leaf(DATA, '#cdata-section' if self._cdata else '#text', value)
+
+    def _start_element(self, name, attributes):
+        self._flush()
+        self.writer.start(ELEMENT, name, None, attributes)
+
+    def _end_element(self, name):
+        self._flush()
+        self.writer.end()
+
+    def _start_cdata(self):
+        self._flush()
+
+        self._cdata = True
+
+    def _end_cdata(self):
+        self._flush()
+
+        self._cdata = False
+
+    def _comment(self, data):
+        self._flush()
+
+    def _processing_instruction(self, target, data):
+        self._flush()
+
+        if self.writer.depth():
+            self.writer.leaf(OTHER, target, data)
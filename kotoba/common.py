@@ -1,10 +1,19 @@
 import logging
 import sys
+
+from collections.abc import Mapping
+
 from . import misc
 
 DEFAULT_LOG_LEVEL = logging.DEBUG
 
 class LoggerRepository(object):
+    """ Cache of loggers writing to the standard error
+
+        .. deprecated:: 3.3
+           The trace events are logged to the ``kotoba`` logger without
+           installing any handler (see :func:`set_trace`).
+    """
     _cache = {}
 
     @staticmethod
@@ -31,16 +40,109 @@ class LoggerRepository(object):
 
         return logger
 
+# the callable receiving the trace events, or None to log them
+_trace_handler = None
+
+# the messages of the trace events for logging, formatted only when logged
+_event_formats = {
+    'match':      lambda node, selector: '[SELECTOR/MATCHING] %s --> %s' % (selector.name(), node.name()),
+    'attribute':  lambda node, attribute: '[SELECTOR/ATTRIBUTE] %s --> %s' % (attribute.name(), node.name()),
+    'search':     lambda node, selector: '[SEARCH] %s' % node,
+    'searched':   lambda node, selector, count: '[SEARCH/DONE] %s (%d found)' % (node, count),
+    'initialize': lambda node: '[CHILDREN/INITIALIZED] %s' % node.name(),
+    'merge':      lambda node: '[KAMI/MERGING]',
+}
+
+def set_trace(handler):
+    """ Set the callable receiving the trace events, or ``None`` to disable tracing
+
+        The *handler* is called as ``handler(event, node, details)`` with the
+        name of the event, the node concerned and the dictionary of the other
+        objects involved:
+
+        * ``search`` and ``searched`` (with ``selector``, and ``count`` of the
+          nodes found) around :meth:`kotoba.kotoba.Kotoba.find`;
+        * ``match`` (with ``selector``) and ``attribute`` (with ``attribute``)
+          when a node is tested against a selector or an attribute selector;
+        * ``initialize`` once the children of a node are loaded;
+        * ``merge`` (without node) when a :class:`kotoba.kami.Kami` is extended;
+        * ``message`` (with ``message``) from :func:`node_debug_message`.
+
+        The code emitting the events only checks ``misc.debug_mode`` before
+        doing anything else, so tracing costs one flag check when disabled.
+        Setting ``misc.debug_mode`` without a handler logs the events to the
+        ``kotoba`` logger at the debug level.
+
+        .. versionadded:: 3.3
+    """
+    global _trace_handler
+
+    _trace_handler  = handler
+    misc.debug_mode = handler is not None
+
+def get_trace():
+    """ Get the callable receiving the trace events, if any
+
+        .. versionadded:: 3.3
+    """
+    return _trace_handler
+
+def trace(event, node, **details):
+    """ Emit a trace event (see :func:`set_trace`)
+
+        The callers are expected to check ``misc.debug_mode`` first.
+
+        .. versionadded:: 3.3
+    """
+    (_trace_handler or log_event)(event, node, details)
+
+def log_event(event, node, details):
+    """ Log a trace event to the ``kotoba`` logger
+
+        .. versionadded:: 3.3
+    """
+    logger = logging.getLogger('kotoba')
+
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    if event == 'message':
+        message = details['message']
+    elif event in _event_formats:
+        message = _event_formats[event](node, **details)
+    else:
+        message = '[%s] %s' % (event.upper(), node)
+
+    if details.get('ignore_indentation') or node is None:
+        logger.debug('%s', message)
+    else:
+        logger.debug('%s%s', ' ' * node.level() * 2, message)
+
 def node_debug_message(node, message, ignore_indentation=False):
+    """ Emit a free-form trace message about the *node*
+
+        .. versionchanged:: 3.3
+           Sent as a ``message`` event (see :func:`set_trace`).
+    """
     if not misc.debug_mode:
         return
 
-    LoggerRepository.get('Node', DEFAULT_LOG_LEVEL).debug(
-        message if ignore_indentation else '%s%s' % (' ' * node.level() * 2, message)
-    )
+    trace('message', node, message=message, ignore_indentation=ignore_indentation)
+
+class MemberAttributes(Mapping):
+    """ Base of the read-only views of the members of a JSON object or array as attributes
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ()
+
+    def scalar_items(self):
+        """ Iterate the members which are neither objects nor arrays, as strings
+
+            Unlike :meth:`items`, the objects and the arrays are never turned
+            into strings, which would copy their whole subtrees.
+        """
+        raise NotImplementedError('Interface method not implemented')
 
 def is_string(ref):
-    try:
-        return type(ref) in [unicode, str]
-    except NameError:
-        return type(ref) is str
\ No newline at end of file
+    return isinstance(ref, str)
\ No newline at end of file
@@ -1,4 +1,18 @@
+from xml.dom.minidom import parse as parse_dom, parseString as parse_dom_string
+from xml.dom         import Node
+from xml.etree       import ElementTree
+
+from .common    import MemberAttributes
+from .exception import InvalidInputError
+from .jsonmap   import JSONMap
+
+_ELEMENT_NODE = Node.ELEMENT_NODE
+_COMMENT_NODE = Node.COMMENT_NODE
+_DATA_NODES   = (Node.CDATA_SECTION_NODE, Node.TEXT_NODE)
+
 class IDriver(object):
+    __slots__ = ()
+
     def name(self):
         raise NotImplementedError('Interface method not implemented')
 
@@ -24,51 +38,228 @@ class IDriver(object):
     def initialize_children(kotoba_node):
         raise NotImplementedError('Interface method not implemented')
 
+    def detach(self):
+        """ Get the :class:`DetachedDriver` keeping what the node needs once
+            the source document is released
+
+            .. versionadded:: 3.3
+        """
+        is_data = self.is_data()
+
+        return DetachedDriver(self.name(), self.value() if is_data else None, self.is_element(), is_data, self.__class__)
+
+class DetachedDriver(IDriver):
+    """ Driver of a node whose source document has been released (see :class:`kotoba.kotoba.EagerKotoba`)
+
+        Only the name and the kind of the node are kept, with the value of a
+        data block and the type of a JSON object or array. The children and
+        the attributes are kept by the node itself, and the data is retrieved
+        the same way as with the driver of the source.
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ('_name', '_value', '_is_element', '_is_data', '_source', '_container')
+
+    def __init__(self, name, value, is_element, is_data, source, container=None):
+        self._name       = name
+        self._value      = value
+        self._is_element = is_element
+        self._is_data    = is_data
+        self._source     = source
+        self._container  = container
+
+    def name(self):
+        return self._name
+
+    def attributes(self):
+        return {}
+
+    def children(self):
+        return ()
+
+    def value(self):
+        return self._value
+
+    def container(self):
+        """ Get the type of the JSON object (``dict``) or array (``list``), or ``None`` """
+        return self._container
+
+    def is_element(self):
+        return self._is_element
+
+    def is_comment(self):
+        return False
+
+    def is_data(self):
+        return self._is_data
+
+    def detach(self):
+        return self
+
+    @staticmethod
+    def initialize_children(kotoba_node):
+        pass # The children are attached when the tree is built.
+
+    @staticmethod
+    def retrieve_data(kotoba_node, max_chars=None):
+        source = kotoba_node._node._source
+
+        if max_chars is None:
+            return source.retrieve_data(kotoba_node)
+
+        return source.retrieve_data(kotoba_node, max_chars)
+
 class JSONDriver(IDriver):
+    __slots__ = ('node', '_name', '_children')
+
     def __init__(self, node, name=None):
         self.node = node
         self._name = str(name)
-        self._children = []
+        self._children = None
 
     def name(self):
         return self._name
 
     def attributes(self):
-        return { unicode(k): unicode(v) for k, v in self.children() }
+        """ Get the members of the node as attributes
+
+            .. versionchanged:: 3.3
+               Return a read-only view of the node instead of a copy.
+        """
+        return JSONAttributes(self.node) if self.iterable() else {}
 
     def children(self):
-        if self._children:
-            return self._children
+        if self._children is None:
+            node = self.node
+
+            if isinstance(node, list):
+                self._children = list(enumerate(node))
+            elif isinstance(node, dict):
+                self._children = list(node.items())
+            else: # The node is not iterable.
+                self._children = ()
+
+        return self._children
+
+    def value(self):
+        return self.node
+
+    def iterable(self):
+        return bool(self.node) and isinstance(self.node, (list, dict))
+
+    def detach(self):
+        if self.is_data():
+            return DetachedDriver(self._name, self.node, True, True, JSONDriver)
+
+        return DetachedDriver(self._name, None, True, False, JSONDriver, type(self.node))
+
+    def is_element(self):
+        return True
+
+    def is_comment(self):
+        return False
+
+    def is_data(self):
+        return not self.iterable()
+
+    @staticmethod
+    def initialize_children(kotoba_node):
+        driver_class = kotoba_node._node.__class__ # Instantiate the same node driver.
+        node_class   = kotoba_node.__class__
+        level        = kotoba_node.level() + 1
+        attach       = kotoba_node._attach
+
+        for name, original_child_node in kotoba_node._node.children():
+            attach(node_class(driver_class(original_child_node, name), level))
+
+    @staticmethod
+    def retrieve_data(kotoba_node, max_chars=None):
+        return kotoba_node.original_value()
+
+class JSONAttributes(MemberAttributes):
+    """ Read-only view of the members of a JSON object or array as attributes
+
+        The keys of an array are the indexes. Each value is turned into a
+        string when it is read.
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def __getitem__(self, key):
+        node = self._node
+
+        if isinstance(node, dict):
+            return str(node[key])
+
+        if key in self:
+            return str(node[int(key)])
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        node = self._node
 
-        if isinstance(self.node, list):
-            children = []
-            index    = 0
+        if isinstance(node, dict):
+            return key in node
 
-            for item in self.node:
-                children.append((index, item))
-                index += 1
+        return isinstance(key, str) and key.isdigit() and int(key) < len(node)
 
-            self._children = children
+    def __iter__(self):
+        node = self._node
 
-            return children
+        return iter(node) if isinstance(node, dict) else map(str, range(len(node)))
 
-        if isinstance(self.node, dict):
-            children = []
+    def __len__(self):
+        return len(self._node)
 
-            for k in self.node:
-                children.append((k, self.node[k]))
+    def scalar_items(self):
+        node  = self._node
+        items = node.items() if isinstance(node, dict) else enumerate(node)
 
-            self._children = children
+        return ((str(key), str(value)) for key, value in items if not isinstance(value, (dict, list)))
 
-            return children
+class MappedJSONDriver(IDriver):
+    """ JSON driver over a memory-mapped file (see :class:`kotoba.jsonmap.JSONMap`)
 
-        return [] # The node is not iterable.
+        Each node is the index of a value in the structural index of the
+        document, and values are only decoded when they are read.
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ('document', 'index')
+
+    def __init__(self, document, index=0):
+        self.document = document
+        self.index    = index
+
+    @classmethod
+    def from_file(cls, file_path):
+        return cls(JSONMap.from_file(file_path))
+
+    def name(self):
+        return self.document.name(self.index)
+
+    def attributes(self):
+        return self.document.attributes(self.index)
+
+    def children(self):
+        return list(self.document.children(self.index))
 
     def value(self):
-        return self.node
+        return self.document.value(self.index)
 
     def iterable(self):
-        return len(self.children()) > 0
+        return self.document.is_iterable(self.index)
+
+    def detach(self):
+        if self.is_data():
+            return DetachedDriver(self.name(), self.value(), True, True, MappedJSONDriver)
+
+        return DetachedDriver(self.name(), None, True, False, MappedJSONDriver, self.document.container(self.index))
 
     def is_element(self):
         return True
@@ -81,28 +272,47 @@ class JSONDriver(IDriver):
 
     @staticmethod
     def initialize_children(kotoba_node):
-        for name, original_child_node in kotoba_node._node.children():
-            node_wrapper = kotoba_node._node.__class__(original_child_node, name) # Instantiate the same node driver.
-            child_node   = kotoba_node.__class__(node_wrapper, kotoba_node.level() + 1)
-
-            child_node.parent(kotoba_node)
-            kotoba_node.adjacents().append(child_node)
+        document   = kotoba_node._node.document
+        node_class = kotoba_node.__class__
+        level      = kotoba_node.level() + 1
 
-            if child_node.is_element():
-                kotoba_node._children.append(child_node)
+        for index in document.children(kotoba_node._node.index):
+            kotoba_node._attach(node_class(MappedJSONDriver(document, index), level))
 
     @staticmethod
-    def retrieve_data(kotoba_node):
+    def retrieve_data(kotoba_node, max_chars=None):
         return kotoba_node.original_value()
 
 class XMLDriver(IDriver):
+    __slots__ = ('node',)
+
     def __init__(self, node):
         self.node = node
 
+    @classmethod
+    def from_file(cls, file_path):
+        """ Parse the XML file and wrap the document element.
+
+            .. versionadded:: 3.3
+        """
+        return cls(parse_dom(file_path).documentElement)
+
+    @classmethod
+    def from_string(cls, content):
+        """ Parse the XML content and wrap the document element.
+
+            .. versionadded:: 3.3
+        """
+        return cls(parse_dom_string(content).documentElement)
+
     def name(self):
         return self.node.nodeName
 
     def attributes(self):
+        # Checked first as minidom allocates the attribute maps on the first access.
+        if not self.is_element() or not self.node.hasAttributes():
+            return {}
+
         keys = self.node.attributes.keys()
 
         return {
@@ -121,41 +331,189 @@ class XMLDriver(IDriver):
         return self.node.nodeType
 
     def is_element(self):
-        return self.kind() == self.node.ELEMENT_NODE
+        return self.node.nodeType == _ELEMENT_NODE
 
     def is_comment(self):
-        return self.kind() == self.node.COMMENT_NODE
+        return self.node.nodeType == _COMMENT_NODE
 
     def is_data(self):
-        return self.kind() in [self.node.CDATA_SECTION_NODE, self.node.TEXT_NODE]
+        return self.node.nodeType in _DATA_NODES
 
     @staticmethod
     def initialize_children(kotoba_node):
         for original_child_node in kotoba_node._node.children():
+            # Skip empty data blocks and comments before allocating anything for them.
+            kind = original_child_node.nodeType
+
+            if kind == original_child_node.COMMENT_NODE:
+                continue
+
+            if kind in (original_child_node.CDATA_SECTION_NODE, original_child_node.TEXT_NODE) and not original_child_node.nodeValue:
+                continue
+
             node_wrapper = kotoba_node._node.__class__(original_child_node) # Instantiate the same node driver.
             child_node   = kotoba_node.__class__(node_wrapper, kotoba_node.level() + 1)
 
-            if (child_node.is_data() and not child_node.original_value()) or child_node.is_comment():
-                continue
+            kotoba_node._attach(child_node)
+
+    @staticmethod
+    def retrieve_data(kotoba_node, max_chars=None):
+        text = kotoba_node.iter_text()
+
+        if max_chars is None:
+            return ''.join(text)
+
+        blocks = []
+
+        for block in text:
+            if len(block) >= max_chars:
+                blocks.append(block[:max_chars])
+
+                break
+
+            blocks.append(block)
+
+            max_chars -= len(block)
+
+        return ''.join(blocks)
+
+class ElementTreeDriver(IDriver):
+    """ XML driver backed by :mod:`xml.etree.ElementTree` (with the C accelerator)
+
+        The data blocks, i.e., the text and the tail of the elements, are
+        wrapped as plain strings. The names of the elements in a namespace
+        are in the form of ``{uri}name``. Comments are dropped by the parser.
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @classmethod
+    def from_file(cls, file_path):
+        """ Parse the XML file and wrap the root element. """
+        return cls(ElementTree.parse(file_path).getroot())
+
+    @classmethod
+    def from_string(cls, content):
+        """ Parse the XML content and wrap the root element. """
+        return cls(ElementTree.fromstring(content))
+
+    def name(self):
+        if isinstance(self.node, str):
+            return '#text'
+
+        return self.node.tag
+
+    def attributes(self):
+        if isinstance(self.node, str):
+            return {}
+
+        return self.node.attrib
+
+    def children(self):
+        if isinstance(self.node, str):
+            return
 
-            child_node.parent(kotoba_node)
-            kotoba_node.adjacents().append(child_node)
+        if self.node.text:
+            yield self.node.text
 
-            if child_node.is_element():
-                kotoba_node._children.append(child_node)
+        for cnode in self.node:
+            yield cnode
+
+            if cnode.tail:
+                yield cnode.tail
+
+    def value(self):
+        if isinstance(self.node, str):
+            return self.node
+
+        return None
+
+    def is_element(self):
+        return not isinstance(self.node, str)
+
+    def is_comment(self):
+        return False
+
+    def is_data(self):
+        return isinstance(self.node, str)
 
     @staticmethod
-    def retrieve_data(kotoba_node):
-        data_list = []
+    def initialize_children(kotoba_node):
+        level = kotoba_node.level() + 1
 
-        for child in kotoba_node.children(None, True):
-            if child.is_data():
-                data = child.original_value()
+        # Empty text and tails are never yielded, so every child is kept.
+        for original_child_node in kotoba_node._node.children():
+            child_node = kotoba_node.__class__(ElementTreeDriver(original_child_node), level)
 
-                data_list.append(data)
+            kotoba_node._attach(child_node)
 
-                continue
+    @staticmethod
+    def retrieve_data(kotoba_node, max_chars=None):
+        return XMLDriver.retrieve_data(kotoba_node, max_chars)
+
+class SnapshotDriver(IDriver):
+    """ XML driver over a node of a :class:`kotoba.snapshot.Snapshot`
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ('snapshot', 'index')
+
+    ELEMENT = 0
+    DATA    = 1
+
+    def __init__(self, snapshot, index):
+        self.snapshot = snapshot
+        self.index    = index
+
+    def name(self):
+        return self.snapshot.name(self.index)
+
+    def attributes(self):
+        return self.snapshot.attributes(self.index)
+
+    def children(self):
+        return self.snapshot.children(self.index)
+
+    def value(self):
+        return self.snapshot.value(self.index)
+
+    def is_element(self):
+        return self.snapshot.kinds[self.index] == SnapshotDriver.ELEMENT
+
+    def is_comment(self):
+        return False # Comments are never stored.
+
+    def is_data(self):
+        return self.snapshot.kinds[self.index] == SnapshotDriver.DATA
+
+    @staticmethod
+    def initialize_children(kotoba_node):
+        snapshot   = kotoba_node._node.snapshot
+        node_class = kotoba_node.__class__
+        level      = kotoba_node.level() + 1
+
+        for index in snapshot.children(kotoba_node._node.index):
+            kotoba_node._attach(node_class(SnapshotDriver(snapshot, index), level))
+
+    @staticmethod
+    def retrieve_data(kotoba_node, max_chars=None):
+        return XMLDriver.retrieve_data(kotoba_node, max_chars)
+
+xml_drivers = {
+    'minidom': XMLDriver,
+    'etree':   ElementTreeDriver,
+}
+
+def xml_driver(name):
+    """ Get the XML driver class registered under the *name* (``minidom`` or ``etree``)
 
-            data_list.append(child.data())
+        .. versionadded:: 3.3
+    """
+    if name not in xml_drivers:
+        raise InvalidInputError('The driver {} is not supported.'.format(name))
 
-        return ''.join(data_list)
+    return xml_drivers[name]
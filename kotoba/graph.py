@@ -10,6 +10,8 @@ class Vertex(object):
     *adjacents* (optional, list, default: None) is a list of neighbours (*graph.Vertex*).
     '''
     
+    __slots__ = ('_name', '_adjacents')
+    
     def __init__(self):
         self._name      = None
         self._adjacents = []
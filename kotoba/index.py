@@ -0,0 +1,110 @@
+from array  import array
+from bisect import bisect_right
+
+from .common import MemberAttributes
+
+__all__ = ['DocumentIndex']
+
+class DocumentIndex(object):
+    """
+    Index of the elements of a document by name and by attribute
+
+    :param kotoba.kotoba.Kotoba root: the root of the document.
+
+    Each bucket keeps its elements in document order together with their
+    positions in a pre-order walk, in an array of integers, so the elements
+    of a bucket under any node are found by bisecting the range of positions
+    of the subtree of that node.
+
+    The members of JSON which are objects or arrays are only indexed by name,
+    as their values would copy whole subtrees into the index.
+
+    The index is built once and assumes that the document is not modified.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, root):
+        self._names      = {} # element name -> bucket
+        self._attributes = {} # attribute name -> bucket
+        self._values     = {} # (attribute name, value) -> bucket
+        self._unvalued   = set() # the attribute names with values left out of _values
+        self._ranges     = {} # GUID -> (position, position of the last descendant), for the nodes with children
+
+        self._build(root)
+
+    def _build(self, root):
+        position = 0
+        frames   = [(root, position, iter(root._child_elements()))]
+
+        while frames:
+            node, start, iterator = frames[-1]
+            child = next(iterator, None)
+
+            if child is None:
+                frames.pop()
+
+                if position > start: # A leaf has no descendants to search.
+                    self._ranges[node._guid] = (start, position)
+
+                continue
+
+            position += 1
+
+            self._register(self._names, child.name(), position, child)
+
+            attributes = child.attributes()
+            values     = dict(attributes.scalar_items()) if isinstance(attributes, MemberAttributes) else attributes
+
+            for name in attributes:
+                self._register(self._attributes, name, position, child)
+
+                if name in values:
+                    self._register(self._values, (name, values[name]), position, child)
+                else:
+                    self._unvalued.add(name)
+
+            frames.append((child, position, iter(child._child_elements())))
+
+    def _register(self, buckets, key, position, node):
+        if key not in buckets:
+            buckets[key] = (array('i'), [])
+
+        positions, nodes = buckets[key]
+
+        positions.append(position)
+        nodes.append(node)
+
+    def candidates(self, selector, context):
+        """ Get the descendants of the *context* which may match the *selector*
+
+            Only the smallest bucket suggested by the name and the attributes
+            of the *selector* is used, so the candidates still have to be
+            matched against the selector. Return ``None`` if the selector
+            cannot be answered from the index, e.g., ``*``.
+        """
+        buckets = []
+
+        if selector.name() not in selector.wildcards:
+            buckets.append(self._names.get(selector.name()))
+
+        for attribute in selector.attributes():
+            if attribute.operator() == '=' and not attribute.ignore_case() and attribute.name() not in self._unvalued:
+                buckets.append(self._values.get((attribute.name(), attribute.value())))
+            else:
+                buckets.append(self._attributes.get(attribute.name()))
+
+        if not buckets:
+            return None
+
+        if None in buckets: # At least one requirement is never met.
+            return []
+
+        positions, nodes = min(buckets, key=lambda bucket: len(bucket[1]))
+
+        if context._guid not in self._ranges:
+            return []
+
+        start, end = self._ranges[context._guid]
+
+        return nodes[bisect_right(positions, start):bisect_right(positions, end)]
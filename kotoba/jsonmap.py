@@ -0,0 +1,247 @@
+import json
+import mmap
+
+from array import array
+from re    import compile
+
+from .common    import MemberAttributes
+from .exception import *
+
+__all__ = ['JSONMap', 'JSONMapAttributes']
+
+# One value or closing bracket per match, with the preceding comma and key if any. The
+# groups are the comma, the key, then the value: a string, an opening or a closing
+# bracket, any other scalar, or anything else.
+_re_token = compile(
+    rb'\s*(,\s*)?(?:("[^"\\]*(?:\\.[^"\\]*)*")\s*:\s*)?'
+    rb'(?:("[^"\\]*(?:\\.[^"\\]*)*")|([\[\{])|([\]\}])|([^\s\[\]\{\},:"]+)|(\S))'
+)
+
+_OPEN  = 4
+_CLOSE = 5
+_ERROR = 7
+
+# what the scanner expects next
+_VALUE  = 0 # the top-level value
+_MEMBER = 1 # the first member of a container, or its end
+_NEXT   = 2 # a comma and the next member, or the end of the container
+
+# Every value is an element (the kind 0 of kotoba.snapshot).
+_ELEMENT = 0
+
+class JSONMap(object):
+    """
+    Memory-mapped JSON document with its structural index
+
+    The document is scanned once, recording for each value (numbered in
+    document order) its parent, its last descendant, its name and its byte
+    offsets, in parallel arrays of about 30 bytes per value. The keys are
+    interned, while the values stay in the buffer and are only decoded when
+    they are read, so the resident memory follows the number of values
+    rather than their content.
+
+    The arrays follow the layout of :class:`kotoba.snapshot.Snapshot`, so the
+    document can back a :class:`kotoba.columnar.MappedJSONDocument`. The
+    name of an item of an array is its position, stored as ``-1 - position``.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, buffer):
+        self.buffer   = buffer
+        self._keys    = []
+        self._key_ids = {} # key -> ID
+
+        self._scan()
+
+        self.kinds = bytes([_ELEMENT]) * self.size
+
+    @staticmethod
+    def from_file(file_path):
+        with open(file_path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: # The file is empty.
+                raise InvalidDataSourceError('The file {} is empty.'.format(file_path))
+
+        return JSONMap(buffer)
+
+    def _scan(self):
+        parents = array('i')
+        ends    = array('i') # the index of the last descendant
+        names   = array('i')
+        starts  = array('q')
+        stops   = array('q')
+        opened  = [] # the indexes of the open containers
+        objects = [] # whether each of them is an object
+        counts  = [] # the number of their members so far
+        state   = _VALUE
+        intern  = self._intern
+
+        for matches in _re_token.finditer(self.buffer):
+            comma, key = matches.group(1, 2)
+            kind     = matches.lastindex
+            position = matches.start(kind)
+
+            if not opened:
+                if state != _VALUE or comma or key:
+                    raise InvalidDataSourceError('Unexpected data at byte {}.'.format(position))
+            elif kind == _CLOSE:
+                closing = b'}' if objects[-1] else b']'
+
+                if comma or key or matches.group(kind) != closing:
+                    raise InvalidDataSourceError('Expected a value or "{}" at byte {}.'.format(closing.decode(), position))
+
+                index = opened.pop()
+
+                objects.pop()
+                counts.pop()
+
+                ends[index]  = len(parents) - 1
+                stops[index] = position + 1
+                state        = _NEXT
+
+                continue
+            elif (comma is None) != (state == _MEMBER):
+                raise InvalidDataSourceError('Expected "," at byte {}.'.format(position))
+            elif (key is None) == objects[-1]:
+                raise InvalidDataSourceError('{} key at byte {}.'.format('Expected a' if key is None else 'Unexpected', position))
+
+            if kind == _ERROR or kind == _CLOSE:
+                raise InvalidDataSourceError('Expected a value at byte {}.'.format(position))
+
+            if not opened:
+                name = intern('root')
+            elif key is not None:
+                name = intern(key[1:-1].decode('utf-8') if b'\\' not in key else json.loads(key))
+            else:
+                name = -1 - counts[-1]
+
+            if opened:
+                counts[-1] += 1
+
+            index = len(parents)
+
+            parents.append(opened[-1] if opened else -1)
+            ends.append(index)
+            names.append(name)
+            starts.append(position)
+
+            if kind == _OPEN:
+                stops.append(-1) # set when closed
+
+                opened.append(index)
+                objects.append(matches.group(kind) == b'{')
+                counts.append(0)
+
+                state = _MEMBER
+            else:
+                stops.append(matches.end(kind))
+
+                state = _NEXT
+
+        if opened or state != _NEXT:
+            raise InvalidDataSourceError('Unexpected end of the data.')
+
+        self.parents = parents
+        self.ends    = ends
+        self.names   = names
+        self.starts  = starts
+        self.stops   = stops
+        self.size    = len(parents)
+
+    def _intern(self, key):
+        key_id = self._key_ids.get(key)
+
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._keys)
+
+            self._keys.append(key)
+
+        return key_id
+
+    def key_id(self, key):
+        """ Get the ID of the object *key*, or ``None`` if no object has it """
+        return self._key_ids.get(key)
+
+    def name(self, index):
+        name = self.names[index]
+
+        return self._keys[name] if name >= 0 else str(-1 - name)
+
+    def value(self, index):
+        return self.decode(self.starts[index], self.stops[index])
+
+    def container(self, index):
+        """ Get the type of the value, ``dict`` or ``list``, or ``None`` for a scalar """
+        return {b'{': dict, b'[': list}.get(self.buffer[self.starts[index]:self.starts[index] + 1])
+
+    def is_iterable(self, index):
+        """ Check if the value is an object or an array with members """
+        return self.ends[index] > index
+
+    def children(self, index):
+        child = index + 1
+        end   = self.ends[index]
+
+        while child <= end:
+            yield child
+
+            child = self.ends[child] + 1
+
+    def attributes(self, index):
+        return JSONMapAttributes(self, index) if self.is_iterable(index) else {}
+
+    def attribute(self, index, key):
+        """ Get the member *key* of the value as a string, or ``None``, decoding only that member """
+        for child in self.children(index):
+            if self.name(child) == key:
+                return str(self.value(child))
+
+        return None
+
+    def decode(self, start, end):
+        """ Decode the value in the span """
+        try:
+            return json.loads(self.buffer[start:end])
+        except ValueError as e:
+            raise InvalidDataSourceError('Invalid value at byte {}: {}'.format(start, e))
+
+class JSONMapAttributes(MemberAttributes):
+    """ Read-only view of the members of a value of a :class:`JSONMap` as attributes
+
+        Each value is decoded (and turned into a string) when it is read.
+
+        .. versionadded:: 3.3
+    """
+    __slots__ = ('_document', '_index')
+
+    def __init__(self, document, index):
+        self._document = document
+        self._index    = index
+
+    def __getitem__(self, key):
+        value = self._document.attribute(self._index, key)
+
+        if value is None:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key):
+        return key in iter(self)
+
+    def __iter__(self):
+        document = self._document
+
+        return (document.name(child) for child in document.children(self._index))
+
+    def __len__(self):
+        return sum(1 for _ in self._document.children(self._index))
+
+    def scalar_items(self):
+        document = self._document
+
+        for child in document.children(self._index):
+            if document.container(child) is None:
+                yield document.name(child), str(document.value(child))
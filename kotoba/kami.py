@@ -1,7 +1,16 @@
+from .       import misc
+from .common import trace
+
 class Kami(list):
     """ The list of :class:`kotoba.kotoba.Kotoba`. """
+    __slots__ = ('__registered_nodes',)
+
     def __init__(self):
-        self.__registered_nodes = []
+        # GUIDs of the nodes in the list, for constant-time de-duplication.
+        # The list itself keeps the insertion order. The set is only built
+        # on the first append or extend, so the lists of children built by
+        # the drivers (unique by construction) do not carry one.
+        self.__registered_nodes = None
 
     def children(self, selector=None):
         result = Kami()
@@ -36,14 +45,40 @@ class Kami(list):
 
             return output
 
+    def _registered_nodes(self):
+        if self.__registered_nodes is None:
+            self.__registered_nodes = {kotoba._guid for kotoba in self}
+
+        return self.__registered_nodes
+
     def append(self, kotoba):
-        if kotoba.guid() in self.__registered_nodes:
+        registered = self._registered_nodes()
+
+        if kotoba._guid in registered:
             return
 
-        self.__registered_nodes.append(kotoba.guid())
+        registered.add(kotoba._guid)
 
         super(Kami, self).append(kotoba)
 
     def extend(self, other_kami):
-        for kotoba in other_kami:
-            self.append(kotoba)
\ No newline at end of file
+        if misc.debug_mode:
+            trace('merge', None)
+
+        if not self and isinstance(other_kami, Kami):
+            # Fast path: the other list is already free of duplicates, so
+            # the set can be left to be built when it is needed.
+            super(Kami, self).extend(other_kami)
+
+            self.__registered_nodes = None
+
+            return
+
+        registered = self._registered_nodes()
+        register   = registered.add
+
+        super(Kami, self).extend([
+            kotoba
+            for kotoba in other_kami
+            if kotoba._guid not in registered and not register(kotoba._guid)
+        ])
@@ -1,52 +1,93 @@
-from re      import split
-from time    import time
-
-from .common    import node_debug_message, is_string
+from itertools import count
+from re        import split
+from threading import Lock, RLock
+from time      import time
+from types     import MappingProxyType
+
+from .          import misc
+from .common    import MemberAttributes, node_debug_message, is_string, trace
+from .driver    import xml_driver
 from .exception import *
 from .graph     import Vertex
+from .index     import DocumentIndex
 from .kami      import Kami
-from .selector  import PathType
-from .parser    import selector as parse_selector
+from .selector  import PathType, match_ancestors, match_context
+from .parser    import compile_selector
+
+__all__ = ['Kotoba', 'EagerKotoba']
 
-__all__ = ['Kotoba']
+_NO_ATTRIBUTES = MappingProxyType({})
+
+# Held while the lock of a document is allocated, i.e., once per document.
+# The children of a node are then initialized under the lock of its document,
+# once, after which they are read without locking.
+_allocation_lock = Lock()
 
 class Kotoba(Vertex):
     """
     XML Parser with Level-3 CSS Selectors
 
-    :param kotoba.driver.IDriver node:
+    :param kotoba.driver.IDriver node: the node driver, or the XML content as a string
+    :param str driver: the XML driver to parse the content with, ``minidom`` (default) or ``etree``
 
     Currently supported selectors:
 
-    * selectors with at least one of element name, attributes and pseudo classes (only ``:root`` and ``:empty``)
+    * selectors with at least one of element name, attributes and pseudo classes (``:root``, ``:empty``,
+      ``:first-child``, ``:last-child``, ``:only-child``, ``:nth-child(an+b)``, ``:nth-of-type(an+b)``
+      and ``:not(...)``)
     * all four combinations of selectors are supported (e.g., ``selector_1 operator_1 selector_2 ...``)
     * support wildcard search (only for element name)
     * support multi combinations in a single statement (e.g., ``combo_1, combo_2``)
+
+    A tree can be queried from many threads at once. Each node loads its
+    children under the lock of its document the first time they are needed, and the other
+    lazily computed values (attributes, data, positions) are idempotent. Call
+    :meth:`freeze` to load the whole tree up front, so that later queries
+    never wait on the lock.
     """
 
-    static_guid = 1
+    __slots__ = (
+        '_guid', '_level', '_node', '_parent', '_data', '_elements', '_attributes',
+        '_is_children_initialized', '_index', '_position', '_type_position', '_lock',
+    )
+
     debug_mode  = False
 
-    def __init__(self, node=None, level=0):
+    # The allocation of GUIDs is atomic as next() on itertools.count holds the GIL.
+    _guid_sequence = count(1)
+
+    def __init__(self, node=None, level=0, driver='minidom'):
         """ Construct an XML parser using CSS3 selectors """
-        super(self.__class__, self).__init__()
+        # The fields of the vertex are set here, as this runs for every node.
+        if is_string(node):
+            node = xml_driver(driver).from_string(node)
 
-        self._guid   = Kotoba.static_guid
+        self._guid   = next(Kotoba._guid_sequence)
         self._level  = level
         self._node   = node
         self._parent = None
         self._data   = None
-        self._adjacents  = Kami()
-        self._children   = Kami()
         self._attributes = None
 
+        # position among the elements of the parent, and among the ones with the same name
+        self._position      = 0
+        self._type_position = None
+
+        # The lists are only allocated once there is something to put in, so
+        # leaves do not carry empty lists.
+        self._adjacents  = None
+        self._elements   = None
+
         # lazy-loading flag
         self._is_children_initialized = False
 
-        self.name(node.name())
+        # only set on the root of an indexed document
+        self._index = None
 
-        # Take care of static data
-        Kotoba.static_guid += 1
+        # shared by the nodes of the document, allocated on the first initialization
+        self._lock = None
+
+        self._name = node.name()
 
     def guid(self):
         return self._guid
@@ -60,6 +101,56 @@ class Kotoba(Vertex):
 
         return self._parent
 
+    def position(self):
+        """ Get the position of this element among the elements of its parent.
+
+            .. versionadded:: 3.3
+        """
+        return self._position
+
+    def type_position(self):
+        """ Get the position of this element among the elements of its parent with the same name.
+
+            The positions are computed for all the siblings at once on the first call.
+
+            .. versionadded:: 3.3
+        """
+        if self._type_position is None:
+            if self._parent is None:
+                self._type_position = 0
+            else:
+                self._parent._count_types()
+
+        return self._type_position
+
+    def previous_element(self):
+        """ Get the element right before this one among the elements of its parent, or ``None``
+
+            .. versionadded:: 3.3
+        """
+        if not self._position:
+            return None
+
+        return self._parent._child_elements()[self._position - 1]
+
+    def sibling_count(self):
+        """ Get the number of elements of the parent, including this one
+
+            .. versionadded:: 3.3
+        """
+        if self._parent is None:
+            return 1
+
+        return len(self._parent._child_elements())
+
+    def _count_types(self):
+        counts = {}
+
+        for child in self._child_elements():
+            child._type_position = counts.get(child._name, 0)
+
+            counts[child._name] = child._type_position + 1
+
     def attribute(self, key):
         if not key in self.attributes():
             return None
@@ -70,24 +161,49 @@ class Kotoba(Vertex):
         return key in self.attributes()
 
     def attributes(self):
-        if not self._attributes:
-            self._attributes = dict(self.node().attributes())
+        if self._attributes is None:
+            attributes = self.node().attributes()
+
+            # Nodes without attributes share one read-only mapping. The others
+            # keep what the driver returns, which may be a lazy view.
+            self._attributes = attributes if attributes else _NO_ATTRIBUTES
 
         return self._attributes
 
+    @property
+    def _children(self):
+        # The child elements as the drivers written for 3.2 append to them. The
+        # list is allocated on the first access (see :meth:`_attach`).
+        if self._elements is None:
+            self._elements = Kami()
+
+        return self._elements
+
+    def adjacents(self):
+        """ Get the child nodes, data blocks included
+
+            .. versionchanged:: 3.3
+               The list is only allocated on the first call for a node without
+               children, and kept, so that the drivers may still append to it.
+        """
+        if self._adjacents is None:
+            self._adjacents = Kami()
+
+        return self._adjacents
+
     def children(self, selector=None, include_data_blocks=False):
         if not self._is_children_initialized:
-            self._node.__class__.initialize_children(self)
-
-            self._is_children_initialized = True
+            self._initialize_children()
 
         if is_string(selector):
-            selector = parse_selector(selector)
+            selector = compile_selector(selector)
 
         returnees = self._children
 
         if selector:
-            returnees = self._find_descendants(selector, True)
+            returnees = Kami()
+
+            returnees.extend(self._verify(selector.chain(), self._child_elements()))
         if include_data_blocks:
             returnees = self.adjacents()
 
@@ -95,7 +211,7 @@ class Kotoba(Vertex):
 
     def find(self, selector):
         if is_string(selector):
-            selector = parse_selector(selector)
+            selector = compile_selector(selector)
 
         if not selector:
             raise InvalidSelectorError()
@@ -104,53 +220,401 @@ class Kotoba(Vertex):
 
         return returnees
 
+    def ifind(self, selector):
+        """ Lazily iterate the descendants matching the *selector* in document order
+
+            Unlike :meth:`find`, the search stops as soon as the caller stops
+            consuming the iterator, e.g., ``next(node.ifind('item'), None)``
+            only looks as far as the first match.
+
+            .. versionadded:: 3.3
+        """
+        if is_string(selector):
+            selector = compile_selector(selector)
+
+        if not selector:
+            raise InvalidSelectorError()
+
+        search_type = selector.kind()
+
+        if search_type == PathType.any_siblings or search_type == PathType.immediate_siblings:
+            raise InvalidSelectorError('The selector cannot start with a sibling combinator.')
+
+        return self._search(selector)
+
+    def find_many(self, selectors):
+        """ Find the descendants matching each of the *selectors* in one traversal
+
+            :param dict selectors: the selectors (strings or compiled) by key.
+
+            :return: the dictionary of :class:`kotoba.kami.Kami` by key, in
+                     document order.
+
+            The selectors are dispatched by the name of their last simple
+            selector, so each node is only tested against the selectors which
+            may end on it, and the rest of each chain is checked from right to
+            left. The cost is about one walk over the subtree, whatever the
+            number of selectors.
+
+            .. versionadded:: 3.3
+        """
+        by_name  = {} # name -> [(selector, chain, memo, matches)]
+        any_name = []
+        matches  = {}
+
+        for key, selector in selectors.items():
+            if is_string(selector):
+                selector = compile_selector(selector)
+
+            if not selector:
+                raise InvalidSelectorError()
+
+            if selector.kind() in (PathType.any_siblings, PathType.immediate_siblings):
+                raise InvalidSelectorError('The selector cannot start with a sibling combinator.')
+
+            chain = selector.chain()
+            last  = chain[-1]
+            entry = (last, chain, {}, [])
+
+            matches[key] = entry[3]
+
+            if last.name() in last.wildcards:
+                any_name.append(entry)
+            else:
+                by_name.setdefault(last.name(), []).append(entry)
+
+        lineage   = [] # the ancestors of the current node below this one
+        iterators = [iter(self._child_elements())]
+
+        while iterators:
+            child = next(iterators[-1], None)
+
+            if child is None:
+                iterators.pop()
+
+                if lineage:
+                    lineage.pop()
+
+                continue
+
+            for entries in (by_name.get(child.name(), ()), any_name):
+                for last, chain, memo, found in entries:
+                    if last.match(child) and match_ancestors(chain, child, lineage, memo):
+                        found.append(child)
+
+            lineage.append(child)
+            iterators.append(iter(child._child_elements()))
+
+        returnees = {}
+
+        for key, found in matches.items():
+            returnees[key] = Kami()
+
+            returnees[key].extend(found)
+
+        return returnees
+
+    def freeze(self):
+        """ Load the whole subtree of this node at once
+
+            All children, attributes and positions of the subtree are loaded,
+            so the later queries only read the tree and never take the lock
+            used to load children lazily. Data blocks are still joined on
+            demand, which needs no lock either.
+
+            :return: this node
+
+            .. versionadded:: 3.3
+        """
+        nodes = [self]
+
+        while nodes:
+            node = nodes.pop()
+
+            node.attributes()
+
+            if not node.is_element():
+                continue
+
+            node._count_types()
+
+            nodes.extend(node._data_blocks())
+
+        return self
+
+    def build_index(self):
+        """ Build the index of the element names and attributes of the whole document
+
+            Once the document root is indexed, :meth:`find` and :meth:`ifind`
+            from any node of the document take their candidates from the index
+            and only check the ancestors of each candidate, instead of visiting
+            every descendant. The whole document is loaded in the process.
+
+            .. versionadded:: 3.3
+        """
+        root = self.root()
+
+        root._index = DocumentIndex(root)
+
+        return root._index
+
+    def index(self):
+        """ Get the index of the document, or ``None`` if it is not indexed.
+
+            .. versionadded:: 3.3
+        """
+        return self.root()._index
+
+    def root(self):
+        """ Get the root of the document.
+
+            .. versionadded:: 3.3
+        """
+        node = self
+
+        while node._parent is not None:
+            node = node._parent
+
+        return node
+
     def __repr__(self):
         return '<{}:{}>'.format(self.__class__.__name__, self.name())
 
     @staticmethod
     def _direct_search(node, selector):
-        node_debug_message(node, node)
-
         search_type = selector.kind()
 
         if search_type == PathType.any_siblings or search_type == PathType.immediate_siblings:
-            raise Runtime('Future Features')
+            raise InvalidSelectorError('The selector cannot start with a sibling combinator.')
 
-        node_debug_message(node, '[SEARCH] DESCENDANTS/CHILDREN')
+        if misc.debug_mode:
+            trace('search', node, selector=selector)
 
         # Continue the search from the descendants.
-        return node._find_descendants(selector, search_type == PathType.children)
+        returnees = Kami()
+
+        returnees.extend(node._search(selector))
+
+        if misc.debug_mode:
+            trace('searched', node, selector=selector, count=len(returnees))
+
+        return returnees
 
     def debug_message(self, message, ignore_indentation=False):
         node_debug_message(self, message, ignore_indentation)
 
-    def _find_descendants(self, selector, stop_here=False):
-        returnees = Kami()
+    def _search(self, selector):
+        """ Pick the search strategy from the shape of the *selector*
+
+            * with an index, the candidates are taken from the index and
+              checked from right to left (see :meth:`build_index`);
+            * a chain with two or more descendant combinators and ending with
+              a selective selector (an element name or an attribute) is checked
+              from right to left on every descendant, like browser engines do,
+              as most nodes fail on the first test while the partial matches
+              from left to right pile up;
+            * a chain with ``+`` or ``~`` is always checked from right to left,
+              as each element knows its position among its siblings;
+            * otherwise, e.g., a single selector, a chain of ``>`` or a chain
+              ending with ``*``, the descendants are matched from left to right
+              in one pass.
+        """
+        chain = selector.chain()
+        last  = chain[-1]
+        index = self.index()
+
+        if index is not None:
+            candidates = index.candidates(last, self)
+
+            if candidates is not None:
+                return self._verify(chain, candidates)
+
+        kinds = [sub_selector.kind() for sub_selector in chain[1:]]
+
+        if PathType.immediate_siblings in kinds or PathType.any_siblings in kinds:
+            return self._verify(chain, self._iter_elements())
+
+        if last.name() not in last.wildcards or last.attributes():
+            descendant_combinators = [kind for kind in kinds if kind in (None, PathType.descendants)]
 
-        for child in self.children():
-            if not child.is_element():
-                raise RuntimeException('This child is not an element.')
+            if len(descendant_combinators) > 1:
+                return self._verify(chain, self._iter_elements())
 
-            if selector.match(child): # if matched
-                if not selector.next(): # if this is the last selector
-                    returnees.append(child)
-                    if not child.children():
-                        continue
+        return self._iter_descendants(selector)
 
-                    if not stop_here:
-                        returnees.extend(child.find(selector))
+    def _verify(self, chain, candidates):
+        """ Check each of the *candidates* in this subtree against the *chain* from right to left """
+        last = chain[-1]
 
+        if len(chain) == 1:
+            anchored = last.kind() == PathType.children
+
+            for candidate in candidates:
+                if (not anchored or candidate._parent is self) and last.match(candidate):
+                    yield candidate
+
+            return
+
+        memo = {}
+
+        for candidate in candidates:
+            if last.match(candidate) and match_ancestors(chain, candidate, candidate._lineage(self), memo):
+                yield candidate
+
+    def _iter_elements(self):
+        """ Iterate all descendant elements in document order """
+        iterators = [iter(self._child_elements())]
+
+        while iterators:
+            child = next(iterators[-1], None)
+
+            if child is None:
+                iterators.pop()
+
+                continue
+
+            yield child
+
+            iterators.append(iter(child._child_elements()))
+
+    def _lineage(self, context):
+        """ Get the ancestors of this node below the *context*, from the outermost one """
+        ancestors = []
+        node      = self._parent
+
+        while node is not context:
+            ancestors.append(node)
+
+            node = node._parent
+
+        ancestors.reverse()
+
+        return ancestors
+
+    def _iter_descendants(self, selector):
+        """ Traverse the descendants in document order with an explicit stack
+
+            Each stack frame holds the iterator over the children of a node and
+            the states the children are tested against. A state is a pair of
+            the selector to match next and whether it must match right at this
+            level (after ``>``) or anywhere below. As all partial matches move
+            forward together, every node is visited once.
+        """
+        states = ((selector, selector.kind() == PathType.children),)
+
+        if selector.next() and match_context(selector, self): # a leading :root
+            states += ((selector.next(), selector.next().kind() == PathType.children),)
+        frames = [(iter(self._child_elements()), states)]
+
+        while frames:
+            iterator, states = frames[-1]
+            child            = next(iterator, None)
+
+            if child is None:
+                frames.pop()
+
+                continue
+
+            matched      = False
+            child_states = []
+
+            for sub_selector, anchored in states:
+                if not anchored:
+                    child_states.append((sub_selector, False))
+
+                if not sub_selector.match(child):
                     continue
 
-                if not stop_here:
-                    returnees.extend(child.find(selector.next()))
+                next_selector = sub_selector.next()
+
+                if next_selector:
+                    child_states.append((next_selector, next_selector.kind() == PathType.children))
+                else:
+                    matched = True
 
+            if matched:
+                yield child
+
+            if not child_states:
                 continue
 
-            if not stop_here:
-                returnees.extend(child.find(selector))
+            frames.append((iter(child._child_elements()), tuple(dict.fromkeys(child_states))))
 
-        return returnees
+    def _initialize_children(self):
+        with self._document_lock():
+            if self._is_children_initialized: # done by another thread
+                return
+
+            self._node.__class__.initialize_children(self)
+            self._settle_children()
+
+            # Set last, as the readers skip the lock once it is set.
+            self._is_children_initialized = True
+
+        # Emitted once the lock is released, so that the handler may use the node.
+        if misc.debug_mode:
+            trace('initialize', self)
+
+    def _document_lock(self):
+        """ Get the lock of the document, which its children inherit when attached """
+        if self._lock is None:
+            with _allocation_lock:
+                if self._lock is None: # not done by another thread
+                    self._lock = RLock()
+
+        return self._lock
+
+    def _settle_children(self):
+        """ Complete the children once the driver has initialized them
+
+            The drivers written for 3.2 append the children to :meth:`adjacents`
+            and ``_children`` themselves rather than calling :meth:`_attach`,
+            which leaves the positions and the lock of the children unset.
+        """
+        adjacents = self._adjacents
+        elements  = self._elements
+
+        if not adjacents:
+            return
+
+        if adjacents[-1]._lock is not self._lock or (elements and elements[-1]._position != len(elements) - 1):
+            for child in adjacents:
+                child._parent = self
+                child._lock   = self._lock
+
+            for position, child in enumerate(elements or ()):
+                child._position = position
+
+        if elements is not None and len(elements) == len(adjacents):
+            # Share the list when all adjacent nodes are elements.
+            self._elements = adjacents
+
+    def _attach(self, child):
+        """ Attach the *child* node while the children are being initialized """
+        child._parent = self
+        child._lock   = self._lock
+
+        # Both lists are free of duplicates by construction.
+        if self._adjacents is None:
+            self._adjacents = Kami()
+
+        list.append(self._adjacents, child)
+
+        if not child.is_element():
+            return
+
+        if self._elements is None:
+            self._elements = Kami()
+
+        child._position = len(self._elements)
+
+        list.append(self._elements, child)
+
+    def _child_elements(self):
+        if not self._is_children_initialized:
+            self._initialize_children()
+
+        return self._elements or ()
 
     def node(self):
         return self._node
@@ -175,11 +639,61 @@ class Kotoba(Vertex):
     def is_data(self):
         return self._node.is_data()
 
-    def data(self):
-        if not self._data:
-            self._data = self._node.__class__.retrieve_data(self)
+    def data(self, max_chars=None):
+        """ Retrieve the data of the node, e.g., the text of an XML element.
+
+            :param int max_chars: the maximum length of the text (optional).
+                                  The extraction stops once the limit is
+                                  reached, and the truncated text is not cached.
 
-        return self._data
+            .. versionchanged:: 3.3
+               Added *max_chars*. Empty text is cached as well.
+        """
+        data = self._data
+
+        if data is None:
+            if max_chars is not None:
+                data = self._node.__class__.retrieve_data(self, max_chars)
+
+                return data[:max_chars] if is_string(data) else data
+
+            data = self._data = self._node.__class__.retrieve_data(self)
+
+        if max_chars is not None and is_string(data):
+            return data[:max_chars]
+
+        return data
+
+    def iter_text(self):
+        """ Iterate over the data blocks under the node in document order
+
+            The blocks are yielded as they are without being joined, so the
+            text of a large document can be consumed without copying it.
+
+            .. versionadded:: 3.3
+        """
+        iterators = [iter(self._data_blocks())]
+
+        while iterators:
+            child = next(iterators[-1], None)
+
+            if child is None:
+                iterators.pop()
+
+                continue
+
+            if child.is_data():
+                yield child.original_value()
+
+                continue
+
+            iterators.append(iter(child._data_blocks()))
+
+    def _data_blocks(self):
+        if not self._is_children_initialized:
+            self._initialize_children()
+
+        return self._adjacents or ()
 
     def dump(self, label, force_print=False, ignore_indentation=False):
         if not force_print:
@@ -201,3 +715,99 @@ class Kotoba(Vertex):
             representative = 'NODE [TYPE-{}] AT LEVEL {} ({})'.format(self.kind(), self.level(), self._guid)
 
         return representative
+
+class EagerKotoba(Kotoba):
+    """
+    Node of a tree built all at once (see :meth:`build`)
+
+    The whole source document is converted in one iterative pass, after which
+    each node only keeps a :class:`kotoba.driver.DetachedDriver` and the
+    source document (e.g., the DOM or the decoded JSON) is released. As every
+    node is loaded, the traversals skip the lazy-loading checks and the lock.
+
+    .. versionadded:: 3.3
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def build(cls, driver):
+        """ Build the tree of the node of the *driver* (:class:`kotoba.driver.IDriver`) """
+        root  = cls(driver)
+        nodes = [root]
+
+        while nodes:
+            node   = nodes.pop()
+            source = node._node
+
+            source.__class__.initialize_children(node)
+            node._settle_children()
+
+            node._is_children_initialized = True
+            node._node                    = source.detach()
+
+            # The members of a JSON container are read from its children later.
+            if node._node.container() is None:
+                attributes = source.attributes()
+
+                node._attributes = dict(attributes) if attributes else _NO_ATTRIBUTES
+
+            if node._adjacents:
+                nodes.extend(node._adjacents)
+
+        return root
+
+    def children(self, selector=None, include_data_blocks=False):
+        if include_data_blocks:
+            return self.adjacents()
+
+        if selector is None:
+            return self._children
+
+        return super(EagerKotoba, self).children(selector)
+
+    def attributes(self):
+        if self._attributes is None:
+            self._attributes = _MemberAttributes(self) if self._adjacents else _NO_ATTRIBUTES
+
+        return self._attributes
+
+    def original_value(self):
+        """ Retrieve the value of the node, rebuilt from the children for a JSON container """
+        container = self._node.container()
+
+        if container is None:
+            return self._node.value()
+
+        if container is dict:
+            return {child._name: child.original_value() for child in self._adjacents or ()}
+
+        return [child.original_value() for child in self._adjacents or ()]
+
+    def _child_elements(self):
+        return self._elements or ()
+
+    def _data_blocks(self):
+        return self._adjacents or ()
+
+class _MemberAttributes(MemberAttributes):
+    """ Read-only view of the members of a JSON container of an :class:`EagerKotoba` as attributes """
+    __slots__ = ('_members',)
+
+    def __init__(self, node):
+        self._members = {child._name: child for child in node._adjacents}
+
+    def __getitem__(self, key):
+        return str(self._members[key].original_value())
+
+    def __contains__(self, key):
+        return key in self._members
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def __len__(self):
+        return len(self._members)
+
+    def scalar_items(self):
+        return ((key, str(child.original_value())) for key, child in self._members.items() if child._node.container() is None)
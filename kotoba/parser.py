@@ -1,6 +1,11 @@
-from re        import sub, split
+from collections import OrderedDict, namedtuple
+from re          import sub, split
+from threading   import Lock
+
 from .selector import Attribute, PathType, Selector
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
 class MemoryBuffer(list):
     ''' Memory buffer for parser '''
     def flush(self):
@@ -21,13 +26,93 @@ class TokenizedSelectorBlock(object):
         self.attributes     = set()
         self.pseudo_classes = set()
 
+class SelectorCache(object):
+    ''' Thread-safe LRU cache of compiled selector chains keyed by the selector string '''
+    def __init__(self, maxsize=256):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock    = Lock()
+        self._hits    = 0
+        self._misses  = 0
+
+    def get(self, path):
+        ''' Get the compiled chain of the *path*, compiling it on a miss. '''
+        with self._lock:
+            compiled = self._entries.get(path)
+
+            if compiled is not None:
+                self._entries.move_to_end(path)
+                self._hits += 1
+
+                return compiled
+
+            self._misses += 1
+
+        # Compile outside the lock. Two threads racing on the same miss build
+        # two equivalent chains and the later one wins, which is harmless.
+        compiled = selector(path)
+
+        if compiled:
+            compiled.freeze()
+
+        if not self._maxsize:
+            return compiled
+
+        with self._lock:
+            self._entries[path] = compiled
+            self._entries.move_to_end(path)
+
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+        return compiled
+
+    def resize(self, maxsize):
+        ''' Change the maximum number of cached chains. Zero disables the cache. '''
+        with self._lock:
+            self._maxsize = maxsize
+
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        ''' Drop all cached chains and reset the statistics. '''
+        with self._lock:
+            self._entries.clear()
+
+            self._hits   = 0
+            self._misses = 0
+
+    def info(self):
+        ''' Get the statistics as :class:`CacheInfo`. '''
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+cache = SelectorCache()
+
+def compile_selector(path):
+    '''
+    Get the compiled and immutable chain of selectors for the *path* from the cache.
+
+    .. versionadded:: 3.3
+    '''
+    return cache.get(path)
+
+def cache_info():
+    ''' Get the statistics of the selector cache. '''
+    return cache.info()
+
+def set_cache_size(maxsize):
+    ''' Set the maximum number of chains kept by the selector cache. '''
+    cache.resize(maxsize)
+
 def selector(path):
     '''
     Parse a given *path* as the list of selector.
     '''
     
     selector = None
-    path     = split(r' ', sub(r'\s{2,}', ' ', path.strip()))
+    path     = split_path(path)
     
     previous_selector = None
     combinator        = None
@@ -51,6 +136,44 @@ def selector(path):
     
     return selector
 
+def split_path(path):
+    '''
+    Split the *path* into selector blocks and combinators at the whitespaces
+    outside of brackets, parentheses and quoted strings.
+
+    .. versionadded:: 3.3
+    '''
+    if '[' not in path and '(' not in path:
+        return split(r' ', sub(r'\s{2,}', ' ', path.strip()))
+
+    blocks = []
+    memory = MemoryBuffer()
+    quote  = None
+    depth  = 0
+
+    for ch in path.strip():
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'' and depth:
+            quote = ch
+        elif ch in '[(':
+            depth += 1
+        elif ch in '])':
+            depth -= 1
+        elif ch.isspace() and not depth:
+            if memory:
+                blocks.append(memory.flush())
+
+            continue
+
+        memory.append(ch)
+
+    if memory:
+        blocks.append(memory.flush())
+
+    return blocks
+
 def selector_block(raw_selector_block):
     '''
     Parse the *raw selector block*.
@@ -66,33 +189,38 @@ def selector_block(raw_selector_block):
     memory = MemoryBuffer()
     current_step = TOKENIZE_NAME
     
+    def store(step, buffer):
+        if step == TOKENIZE_NAME:
+            token.name = buffer
+        elif step == TOKENIZE_ATTRIBUTE:
+            token.attributes.add(buffer)
+        elif step == TOKENIZE_PSEUDO_CLASS:
+            token.pseudo_classes.add(buffer)
+    
+    quote = None
+    depth = 0 # nesting of brackets and parentheses
+    
     # Tokenized the raw block data.
     for ch in raw_selector_block:
-        if ch == '[' and current_step == TOKENIZE_NAME:
-            token.name   = memory.flush()
-            current_step = TOKENIZE_ATTRIBUTE
-        elif ch == ':' and current_step == TOKENIZE_NAME:
-            token.name   = memory.flush()
-            current_step = TOKENIZE_PSEUDO_CLASS
-        elif ch == '[' and current_step == TOKENIZE_ATTRIBUTE:
-            token.attributes.add(memory.flush())
-        elif ch == ':' and current_step == TOKENIZE_ATTRIBUTE:
-            token.attributes.add(memory.flush())
-            current_step = TOKENIZE_PSEUDO_CLASS
-        elif ch == ':' and current_step == TOKENIZE_PSEUDO_CLASS:
-            token.pseudo_classes.add(memory.flush())
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'' and depth:
+            quote = ch
+        elif ch in '[:' and not depth:
+            store(current_step, memory.flush())
+            
+            current_step = TOKENIZE_ATTRIBUTE if ch == '[' else TOKENIZE_PSEUDO_CLASS
+            depth        = 1 if ch == '[' else 0
+        elif ch in '[(':
+            depth += 1
+        elif ch in '])':
+            depth -= 1
         
         memory.append(ch)
     
     # Finish the tokenization.
     if memory:
-        leftover_buffer = memory.flush()
-        
-        if current_step == TOKENIZE_NAME:
-            token.name = leftover_buffer
-        elif current_step == TOKENIZE_ATTRIBUTE:
-            token.attributes.add(leftover_buffer)
-        elif current_step == TOKENIZE_PSEUDO_CLASS:
-            token.pseudo_classes.add(leftover_buffer)
+        store(current_step, memory.flush())
     
     return token
@@ -0,0 +1,210 @@
+import json
+
+from contextlib import contextmanager
+from time       import perf_counter
+
+from .common   import get_trace, set_trace
+from .selector import PathType
+
+__all__ = ['Profile', 'profile']
+
+class Profile(object):
+    """
+    Statistics of the searches run while profiling (see :func:`profile`)
+
+    The statistics are grouped by selector. For each of them, the report gives
+    the number of calls of :meth:`kotoba.kotoba.Kotoba.find`, the wall time,
+    the number of nodes found, the number of distinct nodes visited, the
+    number of lazy initializations of children and of merges of
+    :class:`kotoba.kami.Kami`, and, for each step of the chain, the number of
+    ``match`` calls, the distinct nodes tested, the attribute predicates
+    evaluated and the time spent from each test of the step to the next event.
+
+    The events outside of ``find``, e.g., from :meth:`kotoba.kotoba.Kotoba.children`
+    with a selector, are reported under the selector ``None``.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self):
+        self._records = {} # label -> record
+        self._record  = None
+        self._steps   = {} # id(selector) -> step of the current record
+        self._outside = {} # id(selector) -> step of the record of the events outside of find
+        self._step    = None
+        self._last    = None
+
+        self._started_at = None
+
+    def to_dict(self):
+        return {
+            'selectors': [
+                {
+                    'selector':        label,
+                    'calls':           record['calls'],
+                    'time':            record['time'],
+                    'found':           record['found'],
+                    'nodes_visited':   len(record['nodes']),
+                    'initializations': record['initializations'],
+                    'merges':          record['merges'],
+                    'steps': [
+                        {
+                            'selector':         step['selector'],
+                            'combinator':       step['combinator'],
+                            'match_calls':      step['match_calls'],
+                            'nodes_visited':    len(step['nodes']),
+                            'attribute_checks': step['attribute_checks'],
+                            'time':             step['time'],
+                        }
+                        for step in record['steps']
+                    ],
+                }
+                for label, record in self._records.items()
+            ]
+        }
+
+    def to_json(self, **options):
+        """ Export the report as JSON (the *options* go to :func:`json.dumps`) """
+        return json.dumps(self.to_dict(), **options)
+
+    def _handle(self, event, node, details):
+        now = perf_counter()
+
+        if self._step is not None:
+            self._step['time'] += now - self._last
+
+        self._last = now
+
+        if event == 'search':
+            self._start(details['selector'], now)
+
+            return
+
+        if event == 'searched':
+            self._record['time']  += now - self._started_at
+            self._record['found'] += details['count']
+            self._record = None
+            self._step   = None
+
+            return
+
+        record = self._record or self._outside_record()
+
+        if event == 'match':
+            selector = details['selector']
+            steps    = self._steps if self._record else self._outside
+            step     = steps.get(id(selector))
+
+            if step is None:
+                if self._record and self._step:
+                    step = self._step # a selector nested in :not()
+                else:
+                    step = steps[id(selector)] = self._add_step(record, selector)
+
+            step['match_calls'] += 1
+            step['nodes'].add(node._guid)
+            record['nodes'].add(node._guid)
+
+            self._step = step
+        elif event == 'attribute' and self._step is not None:
+            self._step['attribute_checks'] += 1
+        elif event == 'initialize':
+            record['initializations'] += 1
+        elif event == 'merge':
+            record['merges'] += 1
+
+    def _start(self, selector, now):
+        label = describe(selector)
+
+        if label not in self._records:
+            record = self._new_record()
+
+            for sub_selector in selector.chain():
+                self._add_step(record, sub_selector)
+
+            self._records[label] = record
+
+        record = self._records[label]
+
+        record['calls'] += 1
+
+        self._record     = record
+        self._steps      = {id(sub_selector): step for sub_selector, step in zip(selector.chain(), record['steps'])}
+        self._step       = None
+        self._started_at = now
+
+    def _outside_record(self):
+        if None not in self._records:
+            self._records[None] = self._new_record()
+
+        return self._records[None]
+
+    def _new_record(self):
+        return {'calls': 0, 'time': 0.0, 'found': 0, 'nodes': set(), 'initializations': 0, 'merges': 0, 'steps': []}
+
+    def _add_step(self, record, selector):
+        step = {
+            'selector':         describe(selector, False),
+            'combinator':       PathType.registered[selector.kind()] if selector.kind() is not None else None,
+            'match_calls':      0,
+            'nodes':            set(),
+            'attribute_checks': 0,
+            'time':             0.0,
+        }
+
+        record['steps'].append(step)
+
+        return step
+
+@contextmanager
+def profile():
+    """ Profile the searches in the block
+
+        .. code-block:: python
+
+            with kotoba.profile() as p:
+                document.find('catalog > item price')
+
+            print(p.to_json(indent=2))
+
+        Profiling takes over the trace events (see :func:`kotoba.common.set_trace`)
+        and restores the previous handler at the end. When it is not active,
+        the instrumented code only checks a flag.
+
+        .. versionadded:: 3.3
+    """
+    previous = get_trace()
+    report   = Profile()
+
+    set_trace(report._handle)
+
+    try:
+        yield report
+    finally:
+        set_trace(previous)
+
+def describe(selector, whole_chain=True):
+    """ Get the text of the *selector* (with the rest of its chain if *whole_chain*) """
+    parts = []
+
+    for sub_selector in (selector.chain() if whole_chain else [selector]):
+        if whole_chain and sub_selector.kind() not in (None, PathType.descendants):
+            parts.append(PathType.registered[sub_selector.kind()])
+
+        text = sub_selector.name()
+
+        for attribute in sub_selector.attributes():
+            if attribute.operator():
+                text += '[{}{}"{}"]'.format(attribute.name(), attribute.operator(), attribute.value())
+            else:
+                text += '[{}]'.format(attribute.name())
+
+        for pseudo_class in sub_selector.pseudo_classes():
+            text += ':' + pseudo_class.name()
+
+            if pseudo_class.argument() is not None:
+                text += '({})'.format(pseudo_class.argument())
+
+        parts.append(text)
+
+    return ' '.join(parts)
@@ -1,6 +1,7 @@
 from re import compile, sub, split
 
-from .common    import node_debug_message, is_string
+from .          import misc
+from .common    import is_string, trace
 from .exception import LexicalError
 from .graph     import Vertex as BaseVertex
 
@@ -25,6 +26,9 @@ class Selector(BaseVertex):
         self._kind = _kind
         self._next = None
 
+        # immutability flag
+        self._frozen = False
+
         if is_string(self._block):
             self._name  = self._block
             self._block = None
@@ -36,7 +40,7 @@ class Selector(BaseVertex):
         return self._name
 
     def attributes(self):
-        if not self._attributes:
+        if self._attributes is None:
             self._attributes = []
 
             if self._block:
@@ -47,29 +51,82 @@ class Selector(BaseVertex):
 
         return self._attributes
 
+    def pseudo_classes(self):
+        """ Get the list of pseudo classes
+
+            .. versionadded:: 3.3
+        """
+        if self._pseudo_classes is None:
+            self._pseudo_classes = []
+
+            if self._block:
+                for raw_pseudo_class in self._block.pseudo_classes:
+                    pseudo_class = PseudoClass.parse(raw_pseudo_class)
+
+                    self._pseudo_classes.append(pseudo_class)
+
+        return self._pseudo_classes
+
     def kind(self, _kind=None):
-        if _kind and not self._kind:
+        if _kind and not self._kind and not self._frozen:
             self._kind = _kind
 
         return self._kind
 
     def next(self, next=None):
-        if next and not self._next:
+        if next and not self._next and not self._frozen:
             self._next = next
 
         return self._next
 
+    def freeze(self):
+        """ Resolve everything lazily parsed and make the whole chain immutable
+
+            .. versionadded:: 3.3
+        """
+        for selector in self.chain():
+            selector.name()
+            selector._attributes     = tuple(selector.attributes())
+            selector._pseudo_classes = tuple(selector.pseudo_classes())
+            selector._frozen         = True
+
+        return self
+
+    def frozen(self):
+        return self._frozen
+
+    def chain(self):
+        """ Get the list of selectors from this selector to the end of the chain
+
+            .. versionadded:: 3.3
+        """
+        selectors = []
+        selector  = self
+
+        while selector:
+            selectors.append(selector)
+
+            selector = selector.next()
+
+        return selectors
+
     def match(self, vertex):
-        node_debug_message(vertex, '[SELECTOR/MATCHING] %s --> %s' % (self.name(), vertex.name()))
-        try:
-            if not self.name() in self.wildcards:
-                assert self.name() == '*' or self.name() == vertex.name()
-
-            for attribute in self.attributes():
-                assert attribute.match(vertex)
-        except AssertionError:
+        if misc.debug_mode:
+            trace('match', vertex, selector=self)
+
+        name = self.name()
+
+        if name not in self.wildcards and name != vertex.name():
             return False
 
+        for attribute in self.attributes():
+            if not attribute.match(vertex):
+                return False
+
+        for pseudo_class in self.pseudo_classes():
+            if not pseudo_class.match(vertex):
+                return False
+
         return True
 
     def attribute(self, name):
@@ -88,8 +145,145 @@ class Selector(BaseVertex):
     def __str__(self):
         return u'SELECTOR %s' % self.name()
 
+def match_lineage(chain, vertex, ancestors, memo=None):
+    """ Check if the *vertex* matches the *chain* of selectors, from right to left
+
+        *ancestors* is the list of the ancestors of the *vertex* within the search
+        context (excluding the context itself), ordered from the outermost one.
+
+        *memo* is an optional dictionary shared by the calls made within the
+        same search to remember which siblings satisfy a ``~`` combinator and
+        which ancestors satisfy a descendant combinator, so that each list of
+        siblings and each ancestor is checked once per step of the chain.
+
+        .. versionadded:: 3.3
+    """
+    if not chain[-1].match(vertex):
+        return False
+
+    return match_ancestors(chain, vertex, ancestors, memo)
+
+def match_ancestors(chain, vertex, ancestors, memo=None):
+    """ Check if the ancestors and the siblings of the *vertex* satisfy the *chain*
+        of selectors, given the last selector of the chain already matches the
+        *vertex* (see :func:`match_lineage`)
+
+        .. versionadded:: 3.3
+    """
+    if memo is None:
+        memo = {}
+
+    return _match_ancestors(chain, len(chain) - 1, vertex, ancestors, len(ancestors), memo)
+
+def match_context(selector, context):
+    """ Check if the leading *selector* of a chain matches the search *context* itself
+
+        The context of a search is never one of its results, but a leading
+        ``:root`` stands for the document root, which is the context of any
+        search from the root, e.g., ``root.find(':root > item')``.
+
+        .. versionadded:: 3.3
+    """
+    return _is_root_step(selector) and selector.match(context)
+
+def _is_root_step(selector):
+    if selector.kind() == PathType.children:
+        return False
+
+    return any(pseudo_class.name() == 'root' for pseudo_class in selector.pseudo_classes())
+
+def _match_ancestors(chain, position, vertex, ancestors, depth, memo):
+    # chain[position] is known to match the vertex whose ancestors are ancestors[:depth].
+    kind = chain[position].kind()
+
+    if position == 0:
+        return kind != PathType.children or depth == 0
+
+    previous = chain[position - 1]
+
+    if kind == PathType.children:
+        if not depth: # The parent is the context.
+            return position == 1 and match_context(previous, vertex.parent())
+
+        parent = ancestors[depth - 1]
+
+        return previous.match(parent) and _match_ancestors(chain, position - 1, parent, ancestors, depth - 1, memo)
+
+    if kind == PathType.immediate_siblings:
+        sibling = vertex.previous_element()
+
+        if sibling is None:
+            return False
+
+        return previous.match(sibling) and _match_ancestors(chain, position - 1, sibling, ancestors, depth, memo)
+
+    if kind == PathType.any_siblings:
+        return _first_matching_sibling(chain, position, vertex, ancestors, depth, memo) < vertex.position()
+
+    # Bind the step to the nearest ancestor satisfying the rest of the chain. Whether
+    # any ancestor at or above a given one does is memoized, so that each pair of
+    # step and ancestor is checked once per search, whatever the depth. (A position
+    # has a single combinator, so these keys never clash with the sibling ones.)
+    found   = False
+    visited = []
+
+    for index in range(depth - 1, -1, -1):
+        ancestor = ancestors[index]
+        key      = (position, ancestor.guid())
+
+        if key in memo:
+            found = memo[key]
+
+            break
+
+        visited.append(key)
+
+        if previous.match(ancestor) and _match_ancestors(chain, position - 1, ancestor, ancestors, index, memo):
+            found = True
+
+            break
+
+    for key in visited:
+        memo[key] = found
+
+    if found:
+        return True
+
+    if position == 1 and _is_root_step(previous):
+        return previous.match((ancestors[0] if depth else vertex).parent())
+
+    return False
+
+def _first_matching_sibling(chain, position, vertex, ancestors, depth, memo):
+    # Get the position of the first sibling of the vertex (itself included) which
+    # satisfies chain[:position]. Siblings share the ancestors of the vertex.
+    parent = vertex.parent()
+    key    = (position, parent.guid())
+
+    if key in memo:
+        return memo[key]
+
+    siblings = parent.children()
+    previous = chain[position - 1]
+    first    = len(siblings)
+
+    for index in range(first):
+        sibling = siblings[index]
+
+        if previous.match(sibling) and _match_ancestors(chain, position - 1, sibling, ancestors, depth, memo):
+            first = index
+
+            break
+
+    memo[key] = first
+
+    return first
+
 class Attribute(object):
-    _re_syntax   = compile(r'^\[(?P<name>[^=~\^\$\*\|]+)(?P<operator>[~\^\$\*\|]?=?)(?P<value>.*)\]$')
+    _re_syntax   = compile(
+        r'^\[\s*(?P<name>[^\s=~\^\$\*\|\]]+)\s*(?P<operator>[~\^\$\*\|]?=?)\s*'
+        r'(?P<value>"[^"]*"|\'[^\']*\'|[^\s"\'\]]*)\s*(?P<flag>[iIsS])?\s*\]$'
+    )
     _re_operator = compile(r'^[~\^\$\*\|]?=$')
 
     @staticmethod
@@ -108,18 +302,20 @@ class Attribute(object):
             if not matches['value']:
                 raise LexicalError('Where is the value?')
 
-            if matches['value'][0] == '"':
-                matches['value'] = matches['value'][1:]
-
-            if matches['value'][-1] == '"':
-                matches['value'] = matches['value'][:-1]
+            if matches['value'][0] in '"\'':
+                matches['value'] = matches['value'][1:-1]
+        elif matches['value'] or matches['flag']:
+            raise LexicalError('The operator of the attribute is missing.')
 
         return Attribute(**matches)
 
-    def __init__(self, name, operator, value):
+    def __init__(self, name, operator, value, flag=None):
         self._name     = name
         self._operator = operator
         self._value    = value
+        self._flag     = flag
+
+        self._predicate = self._compile()
 
     def name(self):
         return self._name
@@ -130,19 +326,183 @@ class Attribute(object):
     def value(self):
         return self._value
 
-    def match(self, vertex):
-        try:
-            attribute_value = vertex.attribute(self.name())
+    def flag(self):
+        """ Get the flag of the attribute, e.g., ``i`` for case-insensitive values
+
+            .. versionadded:: 3.3
+        """
+        return self._flag
+
+    def ignore_case(self):
+        """ .. versionadded:: 3.3 """
+        return self._flag in ('i', 'I')
+
+    def _compile(self):
+        """ Compile the operator into a predicate on the actual value of the attribute
+
+            ``None`` stands for the existence check.
+        """
+        operator = self._operator
+        expected = self._value
+
+        if not operator:
+            return None
+
+        if self.ignore_case():
+            expected = expected.lower()
+
+        if operator == '=':
+            predicate = lambda actual: actual == expected
+        elif operator == '~=':
+            if not expected or expected != expected.strip() or len(expected.split()) > 1:
+                predicate = lambda actual: False
+            else:
+                predicate = lambda actual: expected in actual.split()
+        elif operator == '|=':
+            prefix    = expected + '-'
+            predicate = lambda actual: actual == expected or actual.startswith(prefix)
+        elif not expected: # ^=, $= and *= never match an empty value.
+            predicate = lambda actual: False
+        elif operator == '^=':
+            predicate = lambda actual: actual.startswith(expected)
+        elif operator == '$=':
+            predicate = lambda actual: actual.endswith(expected)
+        elif operator == '*=':
+            predicate = lambda actual: expected in actual
+
+        if not self.ignore_case():
+            return predicate
+
+        return lambda actual: predicate(actual.lower())
 
-            assert attribute_value is not None
+    def match(self, vertex):
+        if misc.debug_mode:
+            trace('attribute', vertex, attribute=self)
 
-            if self.operator() == '=':
-                assert self.value() == attribute_value
+        attribute_value = vertex.attribute(self._name)
 
-        except AssertionError:
+        if attribute_value is None:
             return False
 
-        return True
+        predicate = self._predicate
+
+        return predicate is None or predicate(attribute_value)
 
     def __str__(self):
         return u'SELECTOR:ATTRIBUTE %s %s %s' % (self.name(), self.operator(), self.value())
+
+class PseudoClass(object):
+    """ Pseudo class, e.g., ``:first-child`` or ``:nth-child(2n+1)``
+
+        The structural pseudo classes rely on the position of each element
+        among its siblings and of its type, which the nodes compute once per
+        parent, so that each check costs constant time.
+
+        .. versionadded:: 3.3
+    """
+    _re_syntax = compile(r'^:(?P<name>[a-zA-Z-]+)(?:\((?P<argument>.*)\))?$')
+    _re_nth    = compile(r'^(?:(?P<a>[+-]?\d*)n\s*(?:(?P<sign>[+-])\s*(?P<b>\d+))?|(?P<index>[+-]?\d+))$')
+
+    _with_argument    = ('nth-child', 'nth-of-type', 'not')
+    _without_argument = ('root', 'empty', 'first-child', 'last-child', 'only-child')
+
+    @staticmethod
+    def parse(raw_pseudo_class):
+        matches = PseudoClass._re_syntax.search(raw_pseudo_class.strip())
+
+        if not matches:
+            raise LexicalError('The given pseudo class is malformed.')
+
+        name     = matches.group('name').lower()
+        argument = matches.group('argument')
+
+        if name in PseudoClass._without_argument and argument is None:
+            return PseudoClass(name)
+
+        if name in PseudoClass._with_argument and argument and argument.strip():
+            return PseudoClass(name, argument.strip())
+
+        raise LexicalError('The pseudo class :{} is not supported.'.format(name))
+
+    @staticmethod
+    def parse_nth(expression):
+        """ Parse the ``an+b`` *expression* into the pair ``(a, b)`` """
+        expression = expression.strip().lower()
+
+        if expression == 'odd':
+            return 2, 1
+
+        if expression == 'even':
+            return 2, 0
+
+        matches = PseudoClass._re_nth.search(expression)
+
+        if not matches:
+            raise LexicalError('The expression {} is not in the form of an+b.'.format(expression))
+
+        if matches.group('index'):
+            return 0, int(matches.group('index'))
+
+        a = matches.group('a')
+        a = -1 if a == '-' else int(a) if a not in ('', '+') else 1
+        b = int(matches.group('b') or 0)
+
+        return a, -b if matches.group('sign') == '-' else b
+
+    def __init__(self, name, argument=None):
+        self._name     = name
+        self._argument = argument
+
+        self._predicate = self._compile()
+
+    def name(self):
+        return self._name
+
+    def argument(self):
+        return self._argument
+
+    def _compile(self):
+        name = self._name
+
+        if name == 'root':
+            return lambda vertex: vertex.parent() is None
+
+        if name == 'empty':
+            return lambda vertex: not vertex.children(None, True)
+
+        if name == 'first-child':
+            return lambda vertex: vertex.position() == 0
+
+        if name == 'last-child':
+            return lambda vertex: vertex.position() == vertex.sibling_count() - 1
+
+        if name == 'only-child':
+            return lambda vertex: vertex.sibling_count() == 1
+
+        if name == 'not':
+            from .parser import selector_block
+
+            negated = Selector(selector_block(self._argument))
+
+            negated.attributes()
+            negated.pseudo_classes()
+
+            return lambda vertex: not negated.match(vertex)
+
+        a, b = PseudoClass.parse_nth(self._argument)
+
+        if a == 0:
+            nth = lambda index: index == b
+        else:
+            nth = lambda index: (index - b) % a == 0 and (index - b) // a >= 0
+
+        if name == 'nth-child':
+            return lambda vertex: nth(vertex.position() + 1)
+
+        return lambda vertex: nth(vertex.type_position() + 1) # nth-of-type
+
+    def match(self, vertex):
+        return self._predicate(vertex)
+
+    def __str__(self):
+        return u'SELECTOR:PSEUDO-CLASS %s %s' % (self.name(), self.argument())
@@ -0,0 +1,407 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from array import array
+from stat  import S_ISDIR
+
+from .driver    import SnapshotDriver, xml_driver
+from .exception import *
+from .kotoba    import Kotoba
+
+__all__ = ['Snapshot', 'SnapshotWriter', 'load', 'load_snapshot']
+
+MAGIC   = b'KTBS'
+VERSION = 1
+
+# magic, version, byte order, size and mtime (ns) of the source, SHA-256 of the source, number of nodes
+_header = struct.Struct('<4sHHqq32sq')
+
+# Offset of the mtime in the header, rewritten when only the mtime of the source changes.
+_mtime_offset = 4 + 2 + 2 + 8
+
+ELEMENT = SnapshotDriver.ELEMENT
+DATA    = SnapshotDriver.DATA
+OTHER   = 2
+
+# name and type code of each array, in the order of the file
+_sections = (
+    ('kinds',             'B'),
+    ('parents',           'i'),
+    ('first_children',    'i'),
+    ('next_siblings',     'i'),
+    ('ends',              'i'),
+    ('names',             'i'),
+    ('values',            'i'),
+    ('attribute_offsets', 'i'),
+    ('attribute_pairs',   'i'),
+    ('string_offsets',    'q'),
+    ('strings',           'B'),
+)
+
+class Snapshot(object):
+    """
+    Compact, read-only serialization of a parsed document
+
+    The nodes are numbered in document order and described by parallel
+    arrays: the kind, the parent, the first child, the next sibling, the last
+    descendant, the name, the value, and the range of the attributes. All
+    names, attribute values and data blocks are interned in one UTF-8 buffer.
+
+    The arrays are read directly from the *buffer* (e.g., a memory-mapped
+    file) without being copied.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+
+        if len(view) < _header.size:
+            raise InvalidDataSourceError('The snapshot is truncated.')
+
+        magic, version, byte_order, self.source_size, self.source_mtime, self.source_digest, self.size = _header.unpack_from(view)
+
+        if magic != MAGIC or version != VERSION or byte_order != _byte_order():
+            raise InvalidDataSourceError('The snapshot is not compatible.')
+
+        offset = _header.size
+
+        for name, type_code in _sections:
+            if offset + 8 > len(view):
+                raise InvalidDataSourceError('The snapshot is truncated.')
+
+            length, = struct.unpack_from('<q', view, offset)
+
+            offset += 8
+
+            if length < 0 or offset + length > len(view) or length % struct.calcsize(type_code):
+                raise InvalidDataSourceError('The snapshot is corrupt.')
+
+            section = view[offset:offset + length]
+
+            setattr(self, name, section if type_code == 'B' else section.cast(type_code))
+
+            offset += _aligned(length)
+
+        self._buffer = buffer
+        self._cache  = {} # string ID -> string, for the names and the keys of the attributes
+
+    @staticmethod
+    def build(root, source_size=0, source_mtime=0, source_digest=b''):
+        """ Serialize the tree under the *root* (:class:`kotoba.kotoba.Kotoba`) into bytes """
+        writer = SnapshotWriter()
+
+        def start(node):
+            value = node.original_value()
+            kind  = ELEMENT if node.is_element() else DATA if node.is_data() else OTHER
+
+            writer.start(kind, node.name(), value if isinstance(value, str) else None, node.attributes())
+
+            return iter(node._data_blocks())
+
+        iterators = [start(root)]
+
+        while iterators:
+            child = next(iterators[-1], None)
+
+            if child is None:
+                iterators.pop()
+                writer.end()
+
+                continue
+
+            iterators.append(start(child))
+
+        return writer.finish(source_size, source_mtime, source_digest)
+
+    def string(self, string_id):
+        if string_id < 0:
+            return None
+
+        return bytes(self.strings[self.string_offsets[string_id]:self.string_offsets[string_id + 1]]).decode('utf-8')
+
+    def _interned(self, string_id):
+        cache = self._cache
+
+        if string_id not in cache:
+            cache[string_id] = self.string(string_id)
+
+        return cache[string_id]
+
+    def name(self, index):
+        return self._interned(self.names[index])
+
+    def value(self, index):
+        return self.string(self.values[index])
+
+    def attributes(self, index):
+        # The values are decoded each time, as caching them all would keep a
+        # string for each attribute of the document after a single search.
+        pairs = self.attribute_pairs
+        start = self.attribute_offsets[index]
+        end   = self.attribute_offsets[index + 1]
+
+        return {
+            self._interned(pairs[2 * position]): self.string(pairs[2 * position + 1])
+            for position in range(start, end)
+        }
+
+    def attribute(self, index, key):
+        """ Get the value of the attribute *key* of the node, or ``None``, decoding only that value """
+        pairs = self.attribute_pairs
+
+        for position in range(self.attribute_offsets[index], self.attribute_offsets[index + 1]):
+            if self._interned(pairs[2 * position]) == key:
+                return self.string(pairs[2 * position + 1])
+
+        return None
+
+    def children(self, index):
+        child = self.first_children[index]
+
+        while child >= 0:
+            yield child
+
+            child = self.next_siblings[child]
+
+class SnapshotWriter(object):
+    """ Serialize the nodes of a document given in document order
+
+        Each node is opened with :meth:`start`, which makes it the parent of
+        the next nodes until it is closed with :meth:`end`.
+
+        .. versionadded:: 3.3
+    """
+
+    def __init__(self):
+        self._arrays        = {name: array(type_code) for name, type_code in _sections}
+        self._strings       = {} # string -> string ID
+        self._encoded       = []
+        self._offsets       = [0]
+        self._open          = [] # the indexes of the open nodes
+        self._last_children = [] # the index of the last child of each node
+
+    def intern(self, value):
+        strings = self._strings
+
+        if value not in strings:
+            data = value.encode('utf-8')
+
+            strings[value] = len(self._encoded)
+
+            self._encoded.append(data)
+            self._offsets.append(self._offsets[-1] + len(data))
+
+        return strings[value]
+
+    def start(self, kind, name, value=None, attributes=None):
+        """ Open a node and return its index """
+        arrays = self._arrays
+        index  = len(arrays['kinds'])
+        parent = self._open[-1] if self._open else -1
+
+        arrays['kinds'].append(kind)
+        arrays['parents'].append(parent)
+        arrays['first_children'].append(-1)
+        arrays['next_siblings'].append(-1)
+        arrays['ends'].append(index)
+        arrays['names'].append(self.intern(name))
+        arrays['values'].append(-1 if value is None else self.intern(value))
+        arrays['attribute_offsets'].append(len(arrays['attribute_pairs']) // 2)
+
+        if attributes:
+            pairs = arrays['attribute_pairs']
+
+            for key, attribute in attributes.items():
+                pairs.append(self.intern(key))
+                pairs.append(self.intern(attribute))
+
+        self._last_children.append(-1)
+
+        if parent >= 0:
+            last_child = self._last_children[parent]
+
+            if last_child < 0:
+                arrays['first_children'][parent] = index
+            else:
+                arrays['next_siblings'][last_child] = index
+
+            self._last_children[parent] = index
+
+        self._open.append(index)
+
+        return index
+
+    def end(self):
+        """ Close the last open node """
+        index = self._open.pop()
+
+        self._arrays['ends'][index] = len(self._arrays['kinds']) - 1
+
+    def leaf(self, kind, name, value=None):
+        """ Add a node without children """
+        index = self.start(kind, name, value)
+
+        self.end()
+
+        return index
+
+    def size(self):
+        """ Get the number of nodes """
+        return len(self._arrays['kinds'])
+
+    def depth(self):
+        """ Get the number of open nodes """
+        return len(self._open)
+
+    def finish(self, source_size=0, source_mtime=0, source_digest=b''):
+        """ Get the snapshot as bytes """
+        arrays = self._arrays
+
+        arrays['attribute_offsets'].append(len(arrays['attribute_pairs']) // 2)
+        arrays['string_offsets'].extend(self._offsets)
+        arrays['strings'].frombytes(b''.join(self._encoded))
+
+        chunks = [_header.pack(MAGIC, VERSION, _byte_order(), source_size, source_mtime, source_digest, len(arrays['kinds']))]
+
+        for name, _ in _sections:
+            data = arrays[name].tobytes()
+
+            chunks.append(struct.pack('<q', len(data)))
+            chunks.append(data)
+            chunks.append(b'\0' * (_aligned(len(data)) - len(data)))
+
+        return b''.join(chunks)
+
+def default_cache_dir():
+    """ Get ``kotoba`` in the cache directory of the user (``$XDG_CACHE_HOME`` or ``~/.cache``) """
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'kotoba')
+
+def load(file_path, driver='minidom', cache_dir=None):
+    """ Load the XML document through the on-disk snapshot cache
+
+        The snapshot of the file is reused while the size and the modification
+        time of the file are unchanged, or when the content hash still matches.
+        Otherwise, the file is parsed with the *driver* and the snapshot is
+        written again.
+
+        The *cache_dir* (see :func:`default_cache_dir`) is created for the
+        current user only. If another user owns it or may write into it, its
+        snapshots are not trusted and the file is always parsed.
+
+        :return: :class:`kotoba.kotoba.Kotoba` backed by the snapshot.
+
+        .. versionadded:: 3.3
+    """
+    return Kotoba(SnapshotDriver(load_snapshot(file_path, driver, cache_dir), 0))
+
+def load_snapshot(file_path, driver='minidom', cache_dir=None):
+    """ Get the :class:`Snapshot` of the XML document from the cache (see :func:`load`)
+
+        .. versionadded:: 3.3
+    """
+    cache_dir  = cache_dir or default_cache_dir()
+    source     = os.path.abspath(file_path)
+    key        = hashlib.sha1('{}:{}'.format(driver, source).encode('utf-8')).hexdigest()
+    cache_path = os.path.join(cache_dir, key + '.ktbs')
+    stat       = os.stat(source)
+
+    if not _trusted(cache_dir):
+        return Snapshot(_build(source, stat, driver))
+
+    snapshot = _open(cache_path, source, stat)
+
+    if snapshot is None:
+        snapshot = Snapshot(_write(cache_path, _build(source, stat, driver)))
+
+    return snapshot
+
+def _trusted(cache_dir):
+    # Create the directory if needed, and check that nobody else may plant snapshots in it.
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+
+        status = os.lstat(cache_dir)
+    except OSError:
+        return False
+
+    if not S_ISDIR(status.st_mode):
+        return False
+
+    if hasattr(os, 'getuid') and (status.st_uid != os.getuid() or status.st_mode & 0o022):
+        return False
+
+    return True
+
+def _open(cache_path, source, stat):
+    if not os.path.exists(cache_path):
+        return None
+
+    with open(cache_path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # The file is empty.
+            return None
+
+    try:
+        snapshot = Snapshot(buffer)
+    except InvalidDataSourceError:
+        return None
+
+    if snapshot.source_size != stat.st_size:
+        return None
+
+    if snapshot.source_mtime != stat.st_mtime_ns:
+        # Only touched, e.g., checked out again, if the content is the same.
+        if snapshot.source_digest != _digest(source):
+            return None
+
+        try:
+            with open(cache_path, 'r+b') as f:
+                f.seek(_mtime_offset)
+                f.write(struct.pack('<q', stat.st_mtime_ns))
+        except OSError: # checked against the hash again next time
+            pass
+
+    return snapshot
+
+def _build(source, stat, driver):
+    root = Kotoba(xml_driver(driver).from_file(source))
+
+    return Snapshot.build(root, stat.st_size, stat.st_mtime_ns, _digest(source))
+
+def _write(cache_path, data):
+    temporary_path = None
+
+    try:
+        # Written aside and renamed so that concurrent readers never see a partial snapshot.
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(data)
+
+        os.replace(temporary_path, cache_path)
+    except OSError: # The cache is only an optimization; the document is still loaded.
+        if temporary_path is not None and os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+
+    return data
+
+def _digest(file_path):
+    digest = hashlib.sha256()
+
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    return digest.digest()
+
+def _aligned(length):
+    return (length + 7) & ~7
+
+def _byte_order():
+    return 0 if sys.byteorder == 'little' else 1
@@ -0,0 +1,464 @@
+import json
+
+from collections     import deque
+from itertools       import count, islice
+from multiprocessing import Pool
+from xml.dom         import getDOMImplementation
+from xml.dom.pulldom import parse as pull, START_ELEMENT, END_ELEMENT
+from xml.parsers     import expat
+
+from .common    import is_string
+from .driver    import JSONDriver, XMLDriver
+from .exception import *
+from .kotoba    import Kotoba
+from .parser    import compile_selector
+from .selector  import PathType, match_lineage
+
+__all__ = ['XMLStream', 'JSONLinesStream']
+
+class XMLStream(object):
+    """
+    Streaming reader for XML documents
+
+    :param str file_path: the location of the data.
+
+    The document is read with an incremental pull parser and never held in
+    memory as a whole. Only the chain of the currently open elements and the
+    subtrees matching the selector are built, so the peak memory is bounded by
+    the depth of the document and the size of the matched subtrees.
+
+    Each call of :meth:`find` reads the document again from the beginning.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, file_path):
+        self._file_path = file_path
+
+    def find(self, selector):
+        """ Find the descendants of the document element matching the *selector*
+
+            The matching nodes are yielded in document order while the document
+            is being read. Each of them is a fully loaded :class:`kotoba.kotoba.Kotoba`
+            detached from its ancestors, i.e., its ``parent()`` is ``None``.
+        """
+        chain = self._chain(selector)
+
+        with open(self._file_path, 'rb') as stream:
+            events    = pull(stream)
+            ancestors = None # the open elements below the document element
+
+            for event, node in events:
+                if event == END_ELEMENT:
+                    if ancestors:
+                        ancestors.pop()
+
+                    continue
+
+                if event != START_ELEMENT:
+                    continue
+
+                if ancestors is None: # the document element is the search context.
+                    ancestors = []
+
+                    continue
+
+                vertex = Kotoba(XMLDriver(node), len(ancestors) + 1)
+
+                if not match_lineage(chain, vertex, ancestors):
+                    ancestors.append(vertex)
+
+                    continue
+
+                # The subtree is loaded only when its root matches. As the end
+                # of the element is consumed, the element is not pushed.
+                events.expandNode(node)
+
+                yield vertex
+
+                for descendant in self._find_within(chain, vertex, ancestors):
+                    yield descendant
+
+    def load(self, selector):
+        """ Load only the parts of the document which the *selector* can match
+
+            The elements matching the selector are loaded with their whole
+            subtrees, and their ancestors are kept with their attributes so
+            that the parent links and the combinators still work. Anything
+            else, including the data blocks of the ancestors, is skipped.
+            Hence, ``load(selector).find(selector)`` gives the same elements
+            as a full load.
+
+            As the document element is the context of :meth:`find`, the
+            selector usually starts below it, e.g., ``item > price``. The
+            first step may also match the document element itself, e.g.,
+            ``catalog > item > price`` on ``<catalog>``, in which case the
+            elements matching the rest of the selector are loaded as well.
+
+            The document is read with expat, and each element is matched on
+            the name and the attributes given by expat, so no node is built
+            for the elements which are not kept, nor any text out of the kept
+            subtrees. The subtrees which the selector cannot reach, e.g., below
+            ``other`` for ``> item > price``, are skipped without being matched.
+            Hence, the memory and most of the time follow the matched content,
+            on top of the time expat takes to read the whole file.
+
+            :return: :class:`kotoba.kotoba.Kotoba` of the document element.
+
+            .. versionadded:: 3.3
+        """
+        builder = _PrunedBuilder(self._chain(selector))
+
+        with open(self._file_path, 'rb') as stream:
+            try:
+                builder.parser.ParseFile(stream)
+            except expat.ExpatError as e:
+                raise InvalidDataSourceError('{}: {}'.format(self._file_path, e))
+
+        return Kotoba(XMLDriver(builder.root))
+
+    def _chain(self, selector):
+        if is_string(selector):
+            selector = compile_selector(selector)
+
+        if not selector:
+            raise InvalidSelectorError()
+
+        chain = selector.chain()
+
+        for sub_selector in chain:
+            if sub_selector.kind() in (PathType.any_siblings, PathType.immediate_siblings):
+                raise InvalidSelectorError('Sibling combinators are not supported in streaming mode.')
+
+            if sub_selector.pseudo_classes():
+                raise InvalidSelectorError('Pseudo classes are not supported in streaming mode.')
+
+        return chain
+
+    def _find_within(self, chain, node, ancestors):
+        lineage = list(ancestors)
+        lineage.append(node)
+
+        iterators = [iter(node.children())]
+
+        while iterators:
+            child = next(iterators[-1], None)
+
+            if child is None:
+                iterators.pop()
+                lineage.pop()
+
+                continue
+
+            if match_lineage(chain, child, lineage):
+                yield child
+
+            lineage.append(child)
+            iterators.append(iter(child.children()))
+
+class _StartTag(object):
+    """ Element being read by expat, with as much as a selector needs to match it
+
+        The tags are only held while the element is tested, so no node is
+        built for the elements which are not kept.
+    """
+    __slots__ = ('_guid', '_name', '_attributes', '_level')
+
+    def __init__(self, guid, name, attributes, level):
+        self._guid       = guid
+        self._name       = name
+        self._attributes = attributes
+        self._level      = level
+
+    def guid(self):
+        return self._guid
+
+    def name(self):
+        return self._name
+
+    def level(self):
+        return self._level
+
+    def attributes(self):
+        return self._attributes
+
+    def attribute(self, key):
+        return self._attributes.get(key)
+
+    def has_attribute(self, key):
+        return key in self._attributes
+
+class _PrunedBuilder(object):
+    """ Build the pruned minidom tree of :meth:`XMLStream.load` from the events of expat
+
+        The elements are matched from left to right on the name and the
+        attributes given by expat, like :meth:`kotoba.kotoba.Kotoba._iter_descendants`:
+        each open element holds the states its children are tested against,
+        i.e., the selector to match next and whether it must match right at
+        that level. The elements matching the whole chain are loaded with
+        their subtrees, and only then are their open ancestors built and
+        attached. An element leaving no state to its children is skipped
+        with its whole subtree, which is neither matched nor built.
+    """
+
+    def __init__(self, chain):
+        first = chain[0]
+
+        self.states   = ((first, first.kind() == PathType.children),) # for the children of the document element
+        self.root     = None # the document element, always kept
+        self.document = getDOMImplementation().createDocument(None, None, None)
+        self.open     = []   # [name, attributes, states, DOM node once attached] by open element below the document element
+        self.subtree  = []   # the open elements of the subtree being loaded
+        self.skipped  = 0    # the depth within the subtree being skipped
+        self.parser   = expat.ParserCreate()
+        self._guids   = count()
+        self._text    = []
+        self._cdata   = False
+
+        self.parser.buffer_text                  = True
+        self.parser.StartElementHandler          = self._start_element
+        self.parser.EndElementHandler            = self._end_element
+        self.parser.CharacterDataHandler         = self._characters
+        self.parser.StartCdataSectionHandler     = self._start_cdata
+        self.parser.EndCdataSectionHandler       = self._end_cdata
+        self.parser.CommentHandler               = self._comment
+        self.parser.ProcessingInstructionHandler = self._processing_instruction
+
+    def _flush(self):
+        if not self._text:
+            return
+
+        data = ''.join(self._text)
+
+        del self._text[:]
+
+        if self._cdata:
+            self.subtree[-1].appendChild(self.document.createCDATASection(data))
+        else:
+            self.subtree[-1].appendChild(self.document.createTextNode(data))
+
+    def _characters(self, data):
+        if self.subtree: # The text out of the loaded subtrees is skipped.
+            self._text.append(data)
+
+    def _element(self, name, attributes):
+        element = self.document.createElement(name)
+
+        for key, value in attributes.items():
+            element.setAttribute(key, value)
+
+        return element
+
+    def _tag(self, name, attributes):
+        return _StartTag((id(self), next(self._guids)), name, attributes, len(self.open) + 1)
+
+    def _start_element(self, name, attributes):
+        self._flush()
+
+        if self.subtree:
+            element = self._element(name, attributes)
+
+            self.subtree[-1].appendChild(element)
+            self.subtree.append(element)
+
+            return
+
+        if self.skipped:
+            self.skipped += 1
+
+            return
+
+        if self.root is None:
+            self.root = self._element(name, attributes)
+            first     = self.states[0][0]
+            following = first.next()
+
+            self.document.appendChild(self.root)
+
+            # The first step may match the document element, e.g., "catalog > item" on <catalog>.
+            if following and first.kind() != PathType.children and first.match(self._tag(name, attributes)):
+                self.states += ((following, following.kind() == PathType.children),)
+
+            return
+
+        tag          = self._tag(name, attributes)
+        matched      = False
+        child_states = []
+
+        for sub_selector, anchored in (self.open[-1][2] if self.open else self.states):
+            if not anchored:
+                child_states.append((sub_selector, False))
+
+            if not sub_selector.match(tag):
+                continue
+
+            next_selector = sub_selector.next()
+
+            if next_selector:
+                child_states.append((next_selector, next_selector.kind() == PathType.children))
+            else:
+                matched = True
+
+        if matched:
+            self._attach(self._element(name, attributes))
+
+            return
+
+        if not child_states:
+            self.skipped = 1
+
+            return
+
+        self.open.append([name, attributes, tuple(dict.fromkeys(child_states)), None])
+
+    def _attach(self, element):
+        # Build and attach the open ancestors which are not in the pruned tree yet.
+        parent = self.root
+
+        for entry in self.open:
+            if entry[3] is None:
+                entry[3] = self._element(entry[0], entry[1])
+
+                parent.appendChild(entry[3])
+
+            parent = entry[3]
+
+        parent.appendChild(element)
+
+        self.subtree.append(element)
+
+    def _end_element(self, name):
+        self._flush()
+
+        if self.subtree:
+            self.subtree.pop()
+        elif self.skipped:
+            self.skipped -= 1
+        elif self.open:
+            self.open.pop()
+
+    def _start_cdata(self):
+        self._flush()
+
+        self._cdata = True
+
+    def _end_cdata(self):
+        self._flush()
+
+        self._cdata = False
+
+    def _comment(self, data):
+        self._flush()
+
+        if self.subtree:
+            self.subtree[-1].appendChild(self.document.createComment(data))
+
+    def _processing_instruction(self, target, data):
+        self._flush()
+
+        if self.subtree:
+            self.subtree[-1].appendChild(self.document.createProcessingInstruction(target, data))
+
+class JSONLinesStream(object):
+    """
+    Streaming reader for JSON Lines (NDJSON) documents
+
+    :param str file_path: the location of the data.
+    :param int workers:   the number of processes decoding the lines. With
+                          ``0`` (default), the lines are decoded in this process.
+    :param int chunksize: the number of lines sent to a process at once.
+
+    Each non-blank line is a record loaded as its own :class:`kotoba.kotoba.Kotoba`
+    root, named ``root`` as a JSON document. Only the records being queried
+    (and, with *workers*, a bounded number of decoded chunks) are held in
+    memory, whatever the size of the file.
+
+    Each call of :meth:`find` or :meth:`records` reads the file again from
+    the beginning.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, file_path, workers=0, chunksize=1000):
+        if workers < 0 or chunksize < 1:
+            raise InvalidInputError('The number of workers and the chunk size must be positive.')
+
+        self._file_path = file_path
+        self._workers   = workers
+        self._chunksize = chunksize
+
+    def records(self):
+        """ Iterate over the root of each record in the order of the lines """
+        for value in self._values():
+            yield Kotoba(JSONDriver(value, 'root'))
+
+    def find(self, selector):
+        """ Find the nodes matching the *selector* in each record
+
+            The selector is compiled once and the matching nodes are yielded
+            record by record, in the order of the lines.
+        """
+        if is_string(selector):
+            selector = compile_selector(selector)
+
+        if not selector:
+            raise InvalidSelectorError()
+
+        for record in self.records():
+            for node in record.ifind(selector):
+                yield node
+
+    def _chunks(self):
+        with open(self._file_path, 'r', encoding='utf-8') as stream:
+            line_number = 1
+
+            while True:
+                lines = list(islice(stream, self._chunksize))
+
+                if not lines:
+                    return
+
+                yield line_number, lines
+
+                line_number += len(lines)
+
+    def _values(self):
+        if not self._workers:
+            for chunk in self._chunks():
+                for value in _decode_lines(chunk):
+                    yield value
+
+            return
+
+        with Pool(self._workers) as pool:
+            # Keep a bounded window of chunks in flight so that the memory
+            # does not follow the size of the file.
+            pending = deque()
+
+            for chunk in self._chunks():
+                pending.append(pool.apply_async(_decode_lines, (chunk,)))
+
+                if len(pending) < self._workers * 2:
+                    continue
+
+                for value in pending.popleft().get():
+                    yield value
+
+            while pending:
+                for value in pending.popleft().get():
+                    yield value
+
+def _decode_lines(chunk):
+    line_number, lines = chunk
+    values             = []
+
+    for offset, line in enumerate(lines):
+        if not line.strip():
+            continue
+
+        try:
+            values.append(json.loads(line))
+        except ValueError as e:
+            raise InvalidDataSourceError('Line {}: {}'.format(line_number + offset, e))
+
+    return values
@@ -0,0 +1,62 @@
+''' Benchmark: throughput of the attribute matching per operator
+
+    Usage: python test/benchmark/bench_attribute.py [iterations]
+'''
+
+import sys
+
+from common import measure, report
+
+from kotoba.selector import Attribute
+
+class Vertex(object):
+    ''' Stand-in for a node; Attribute.match only reads the attributes. '''
+    def __init__(self, attributes):
+        self._attributes = attributes
+
+    def attribute(self, key):
+        return self._attributes.get(key)
+
+vertices = [
+    Vertex({'class': 'header main wide', 'lang': 'en-US', 'href': 'https://example.com/index.html'}),
+    Vertex({'class': 'footer', 'lang': 'fr', 'href': 'http://example.org/about.pdf'}),
+    Vertex({'lang': 'EN'}),
+]
+
+raw_attributes = [
+    '[class]',
+    '[class=footer]',
+    '[class~=main]',
+    '[lang|=en]',
+    '[href^=https]',
+    '[href$=".pdf"]',
+    '[href*=example]',
+    '[lang=en i]',
+    '[class~=MAIN i]',
+]
+
+def main(iterations):
+    rows = []
+
+    for raw_attribute in raw_attributes:
+        attribute = Attribute.parse(raw_attribute)
+        match     = attribute.match
+
+        def run():
+            for _ in range(iterations):
+                for vertex in vertices:
+                    match(vertex)
+
+        elapsed = measure(run)
+        calls   = iterations * len(vertices)
+
+        rows.append((
+            raw_attribute,
+            '{:.0f}'.format(calls / elapsed),
+            '{:.1f}'.format(elapsed / calls * 1e9),
+        ))
+
+    report('Attribute.match', ('attribute', 'matches/s', 'ns/match'), rows)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
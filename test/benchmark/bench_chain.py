@@ -0,0 +1,66 @@
+''' Benchmark: left-to-right versus right-to-left matching of long chains
+
+    The document nests elements named "a" to "e" in a repeating pattern, so
+    that long chains of descendant combinators have many partial matches.
+
+    Usage: python test/benchmark/bench_chain.py [depth] [width]
+'''
+
+import sys
+
+from xml.dom.minidom import parseString
+
+from common import measure, report
+
+from kotoba.driver import XMLDriver
+from kotoba.kotoba import Kotoba
+from kotoba.parser import compile_selector
+
+names = 'abcde'
+
+def generate(depth, width):
+    def element(level):
+        name = names[level % len(names)]
+
+        if level == depth:
+            return '<{0}>leaf</{0}>'.format(name)
+
+        return '<{0}>{1}</{0}>'.format(name, element(level + 1) * width)
+
+    return '<root>{}</root>'.format(element(0))
+
+def main(depth, width):
+    root = Kotoba(XMLDriver(parseString(generate(depth, width)).documentElement))
+
+    sum(1 for _ in root._iter_elements()) # load the whole tree first
+
+    rows = []
+
+    for raw_selector in ['a e', 'a b c d e', 'a c e b d', 'a b c d e a b c d', 'a > b > c > d > e', 'a b d']:
+        selector = compile_selector(raw_selector)
+        chain    = selector.chain()
+
+        left_to_right = lambda: sum(1 for _ in root._iter_descendants(selector))
+        right_to_left = lambda: sum(1 for _ in root._verify(chain, root._iter_elements()))
+
+        assert left_to_right() == right_to_left()
+
+        rows.append((
+            raw_selector,
+            left_to_right(),
+            '{:.4f}'.format(measure(left_to_right)),
+            '{:.4f}'.format(measure(right_to_left)),
+            '{:.4f}'.format(measure(lambda: root.find(raw_selector))),
+        ))
+
+    report(
+        'Chains (depth {}, width {})'.format(depth, width),
+        ('selector', 'matches', 'left-to-right (s)', 'right-to-left (s)', 'find (s)'),
+        rows,
+    )
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 9,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
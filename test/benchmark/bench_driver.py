@@ -0,0 +1,62 @@
+''' Benchmark: minidom versus ElementTree drivers
+
+    Usage: python test/benchmark/bench_driver.py [items]
+'''
+
+import os
+import sys
+import tempfile
+
+from common import measure, report
+
+from kotoba import load_from_file
+
+def generate(items):
+    blocks = []
+
+    for index in range(items):
+        blocks.append(
+            '  <item id="{0}" type="{1}">\n'
+            '    <title>Item {0}</title>\n'
+            '    <price currency="CAD">{2}.99</price>\n'
+            '    <tags><tag>a</tag><tag>b</tag></tags>\n'
+            '  </item>\n'.format(index, index % 7, index % 100)
+        )
+
+    return '<?xml version="1.0"?>\n<catalog>\n{}</catalog>\n'.format(''.join(blocks))
+
+def traverse(root):
+    nodes = [root]
+
+    while nodes:
+        nodes.extend(nodes.pop().children(None, True))
+
+def main(items):
+    with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+        f.write(generate(items))
+
+    try:
+        rows = []
+
+        for driver in ('minidom', 'etree'):
+            parse_time    = measure(lambda: load_from_file(f.name, driver=driver))
+            traverse_time = measure(lambda: traverse(load_from_file(f.name, driver=driver)))
+            find_time     = measure(lambda: load_from_file(f.name, driver=driver).find('item > price').data())
+
+            rows.append((
+                driver,
+                '{:.3f}'.format(parse_time),
+                '{:.3f}'.format(traverse_time),
+                '{:.3f}'.format(find_time),
+            ))
+
+        report(
+            'Drivers ({} items, {:.1f} MB)'.format(items, os.path.getsize(f.name) / 1e6),
+            ('driver', 'parse (s)', 'parse + traverse (s)', 'parse + find + data (s)'),
+            rows,
+        )
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,60 @@
+''' Benchmark: JSON traversal and attribute selectors
+
+    Usage: python test/benchmark/bench_json.py [items]
+'''
+
+import json
+import os
+import sys
+import tempfile
+
+from common import measure, report
+
+from kotoba import load_from_file
+
+def generate(items):
+    return {
+        'catalog': [
+            {
+                'id':    index,
+                'type':  index % 7,
+                'title': 'Item {}'.format(index),
+                'price': {'currency': 'CAD', 'amount': index % 100 + 0.99},
+                'tags':  ['a', 'b'],
+            }
+            for index in range(items)
+        ]
+    }
+
+def traverse(root):
+    nodes = [root]
+
+    while nodes:
+        nodes.extend(nodes.pop().children(None, True))
+
+def main(items):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(generate(items), f)
+
+    try:
+        selectors = ['catalog title', '[type=3] title', '[currency] amount', 'catalog > * > price > amount']
+        rows      = []
+
+        for mode in ('dom', 'mmap'):
+            row = [mode, '{:.3f}'.format(measure(lambda: traverse(load_from_file(f.name, mode=mode))))]
+
+            for selector in selectors:
+                row.append('{:.3f}'.format(measure(lambda: load_from_file(f.name, mode=mode).find(selector).data())))
+
+            rows.append(row)
+
+        report(
+            'JSON ({} items, {:.1f} MB)'.format(items, os.path.getsize(f.name) / 1e6),
+            ['mode', 'load + traverse (s)'] + ['{} (s)'.format(selector) for selector in selectors],
+            rows,
+        )
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,66 @@
+''' Benchmark: Kami de-duplication scales linearly with the number of matched nodes
+
+    Usage: python test/benchmark/bench_kami.py [max_size]
+'''
+
+import sys
+
+from common import measure, report
+
+from kotoba.kami import Kami
+
+class Node(object):
+    ''' Stand-in for a matched node; Kami only looks at the GUID. '''
+    __slots__ = ('_guid',)
+
+    def __init__(self, guid):
+        self._guid = guid
+
+def chunks(nodes, size):
+    for start in range(0, len(nodes), size):
+        kami = Kami()
+        kami.extend(nodes[start:start + size])
+
+        yield kami
+
+def main(max_size):
+    rows = []
+    size = 1000
+
+    while size <= max_size:
+        nodes = [Node(guid) for guid in range(size)]
+        parts = list(chunks(nodes, 100))
+
+        def append_each():
+            kami = Kami()
+
+            for node in nodes:
+                kami.append(node)
+
+            for node in nodes: # all duplicates
+                kami.append(node)
+
+        def extend_merge():
+            kami = Kami()
+
+            for part in parts:
+                kami.extend(part)
+
+            kami.extend(nodes) # all duplicates
+
+        append_time = measure(append_each)
+        extend_time = measure(extend_merge)
+
+        rows.append((
+            size,
+            '{:.4f}'.format(append_time),
+            '{:.4f}'.format(extend_time),
+            '{:.1f}'.format(extend_time / size * 1e9),
+        ))
+
+        size *= 10
+
+    report('Kami', ('nodes', 'append (s)', 'extend (s)', 'extend ns/node'), rows)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,73 @@
+''' Benchmark: memory used by the Kotoba tree per node
+
+    The body of test/data/sandbox.xml is repeated to build a larger document.
+    Only the memory allocated while materializing the Kotoba tree is counted,
+    i.e., the DOM itself is excluded. The figure of kotoba 3.2, before the
+    compact nodes, is reported for comparison.
+
+    Usage: python test/benchmark/bench_memory.py [copies]
+'''
+
+import os
+import sys
+import tracemalloc
+
+from xml.dom.minidom import parseString
+
+from common import data_path, report
+
+from kotoba.driver import XMLDriver
+from kotoba.kotoba import Kotoba
+
+# Bytes per node of kotoba 3.2 (a dictionary and two lists by node), measured on
+# the same documents, walking through children(None, True) instead.
+BASELINE_BYTES_PER_NODE = {20: 1311.0, 1000: 1316.1}
+
+def scaled_sandbox(copies):
+    with open(os.path.join(data_path, 'sandbox.xml')) as f:
+        content = f.read()
+
+    start = content.index('>', content.index('<statuses')) + 1
+    end   = content.rindex('</statuses>')
+
+    return '{}{}{}'.format(content[:start], content[start:end] * copies, content[end:])
+
+def materialize(root):
+    count = 1
+    nodes = [root]
+
+    while nodes:
+        node = nodes.pop()
+
+        for child in node._data_blocks(): # unlike adjacents(), allocates no list for the leaves
+            count += 1
+
+            nodes.append(child)
+
+        if node.is_element():
+            node.attributes()
+
+    return count
+
+def main(copies):
+    document = parseString(scaled_sandbox(copies))
+
+    tracemalloc.start()
+
+    before = tracemalloc.take_snapshot()
+    root   = Kotoba(XMLDriver(document.documentElement))
+    count  = materialize(root)
+    after  = tracemalloc.take_snapshot()
+
+    tracemalloc.stop()
+
+    used = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    report(
+        'Memory per node (sandbox.xml x {})'.format(copies),
+        ('nodes', 'bytes', 'bytes/node', 'bytes/node (3.2)'),
+        [(count, used, '{:.1f}'.format(used / count), BASELINE_BYTES_PER_NODE.get(copies, 'n/a'))],
+    )
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
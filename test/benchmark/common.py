@@ -0,0 +1,41 @@
+''' Shared helpers for the benchmark scripts '''
+
+import os
+import sys
+import time
+
+benchmark_path = os.path.dirname(os.path.abspath(__file__))
+code_path      = os.path.abspath(os.path.join(benchmark_path, '..', '..'))
+data_path      = os.path.abspath(os.path.join(benchmark_path, '..', 'data'))
+
+if code_path not in sys.path:
+    sys.path.insert(0, code_path)
+
+def measure(function, repeat=3):
+    ''' Run the *function* *repeat* times and return the best wall time in seconds. '''
+    best = None
+
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        elapsed    = time.perf_counter() - started_at
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+def report(title, headers, rows):
+    ''' Print the *rows* as a plain-text table. '''
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+
+    print(title)
+    print('  '.join(str(header).rjust(width) for header, width in zip(headers, widths)))
+
+    for row in rows:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
+
+    print()
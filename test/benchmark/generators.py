@@ -0,0 +1,137 @@
+''' Synthetic documents for the benchmarks
+
+    Each shape has an XML and a JSON generator taking the size of the document
+    (roughly the number of repeated blocks) and the selectors exercising each
+    combinator on it:
+
+    * wide:       many small siblings under the root;
+    * deep:       chains of nested elements (100 levels each);
+    * attributes: elements with many attributes;
+    * text:       mixed content with long text blocks.
+'''
+
+import json
+
+DEPTH = 100
+WORDS = 'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor'.split()
+
+def sentence(index, words=80):
+    return ' '.join(WORDS[(index + offset) % len(WORDS)] for offset in range(words))
+
+def wide_xml(size):
+    blocks = [
+        '<item id="{0}" group="{1}"><name>Item {0}</name><price>{2}.99</price><stock>{3}</stock></item>'.format(index, index % 10, index % 100, index % 7)
+        for index in range(size)
+    ]
+
+    return '<catalog>{}</catalog>'.format(''.join(blocks))
+
+def wide_json(size):
+    return {
+        'catalog': [
+            {'id': index, 'group': index % 10, 'name': 'Item {}'.format(index), 'price': index % 100 + 0.99, 'stock': index % 7}
+            for index in range(size)
+        ]
+    }
+
+def deep_xml(size):
+    chain = '{}<leaf>end</leaf>{}'.format(
+        ''.join('<node level="{}">'.format(level) for level in range(DEPTH)),
+        '</node>' * DEPTH,
+    )
+
+    return '<forest>{}</forest>'.format(''.join('<tree>{}</tree>'.format(chain) for _ in range(max(1, size // DEPTH))))
+
+def deep_json(size):
+    def tree():
+        node = {'leaf': 'end'}
+
+        for level in reversed(range(DEPTH)):
+            node = {'level': level, 'node': node}
+
+        return node
+
+    return {'forest': [{'tree': tree()} for _ in range(max(1, size // DEPTH))]}
+
+def attributes_xml(size):
+    blocks = [
+        '<item {}/>'.format(' '.join('a{0}="v{1}"'.format(attribute, (index + attribute) % 13) for attribute in range(20)))
+        for index in range(size)
+    ]
+
+    return '<items>{}</items>'.format(''.join(blocks))
+
+def attributes_json(size):
+    return {
+        'items': [
+            {'a{}'.format(attribute): 'v{}'.format((index + attribute) % 13) for attribute in range(20)}
+            for index in range(size)
+        ]
+    }
+
+def text_xml(size):
+    blocks = [
+        '<p>{0} <b>{1}</b> {0} <i>{1}</i> {0}</p>'.format(sentence(index), sentence(index + 1, 5))
+        for index in range(size)
+    ]
+
+    return '<article><title>Text</title>{}</article>'.format(''.join(blocks))
+
+def text_json(size):
+    return {
+        'title':      'Text',
+        'paragraphs': [{'text': sentence(index) * 3, 'note': sentence(index + 1, 5)} for index in range(size)],
+    }
+
+# shape -> format -> (generator, serializer, {combinator: selector})
+shapes = {
+    'wide': {
+        'xml':  (wide_xml, str, {
+            'descendant': 'catalog name',
+            'child':      'catalog > item > price',
+            'adjacent':   'name + price',
+            'sibling':    'name ~ stock',
+            'attribute':  'item[group="3"] name',
+        }),
+        'json': (wide_json, json.dumps, {
+            'descendant': 'catalog name',
+            'child':      'catalog > * > price',
+            'attribute':  '[group="3"] name',
+        }),
+    },
+    'deep': {
+        'xml':  (deep_xml, str, {
+            'descendant': 'tree node leaf',
+            'child':      'tree > node > node > node',
+            'sibling':    'node ~ leaf',
+            'attribute':  'node[level="50"] leaf',
+        }),
+        'json': (deep_json, json.dumps, {
+            'descendant': 'tree node leaf',
+            'child':      'tree > node > node > node',
+        }),
+    },
+    'attributes': {
+        'xml':  (attributes_xml, str, {
+            'descendant': 'items item',
+            'attribute':  'item[a7="v3"][a19^="v1"]',
+            'adjacent':   'item[a0="v0"] + item',
+        }),
+        'json': (attributes_json, json.dumps, {
+            'descendant': 'items a7',
+            'attribute':  '[a7="v3"] a19',
+        }),
+    },
+    'text': {
+        'xml':  (text_xml, str, {
+            'descendant': 'article b',
+            'child':      'article > p > i',
+            'adjacent':   'title + p',
+            'sibling':    'title ~ p',
+        }),
+        'json': (text_json, json.dumps, {
+            'descendant': 'paragraphs text',
+            'child':      'paragraphs > * > note',
+        }),
+    },
+}
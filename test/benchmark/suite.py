@@ -0,0 +1,126 @@
+''' Benchmark suite over the synthetic documents (see generators.py)
+
+    For each shape and format, measure load_from_file, a full traversal with
+    children(), find() with each combinator on a loaded tree, and data(), then
+    the parsing of the selectors without the cache. The results are printed
+    and, with --output, written as JSON to compare runs with --compare.
+
+    Usage: python test/benchmark/suite.py [--size N] [--repeat N] [--shapes wide,deep,...]
+                                          [--output results.json] [--compare baseline.json]
+'''
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+
+from common import measure, report
+
+from generators import shapes
+
+from kotoba        import load_from_file
+from kotoba.parser import selector as parse_selector
+
+def traverse(root):
+    nodes = [root]
+
+    while nodes:
+        nodes.extend(nodes.pop().children(None, True))
+
+def run(size, repeat, shape_names):
+    results = []
+
+    def record(shape, format, operation, seconds, selector=None):
+        results.append({
+            'shape':     shape,
+            'format':    format,
+            'operation': operation,
+            'selector':  selector,
+            'seconds':   seconds,
+        })
+
+    for shape in shape_names:
+        for format, (generate, serialize, selectors) in shapes[shape].items():
+            with tempfile.NamedTemporaryFile('w', suffix='.' + format, delete=False) as f:
+                f.write(serialize(generate(size)))
+
+            try:
+                record(shape, format, 'load', measure(lambda: load_from_file(f.name), repeat))
+
+                document = load_from_file(f.name)
+
+                record(shape, format, 'children', measure(lambda: traverse(document), repeat))
+
+                for combinator, selector in selectors.items():
+                    record(shape, format, 'find:' + combinator, measure(lambda: document.find(selector), repeat), selector)
+
+                # A new tree each run, as the data is cached, with the
+                # children loaded beforehand.
+                roots = [load_from_file(f.name) for _ in range(repeat)]
+
+                for root in roots:
+                    traverse(root)
+
+                record(shape, format, 'data', measure(lambda: roots.pop().data(), repeat))
+            finally:
+                os.unlink(f.name)
+
+    paths = [
+        selector
+        for shape in shape_names
+        for _, _, selectors in shapes[shape].values()
+        for selector in selectors.values()
+    ]
+
+    record(None, None, 'parse', measure(lambda: [parse_selector(path) for path in paths * 100], repeat), '{} selectors x 100'.format(len(paths)))
+
+    return results
+
+def key(result):
+    return (result['shape'], result['format'], result['operation'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('--size', type=int, default=2000, help='the number of blocks per document')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of runs (the best one is kept)')
+    parser.add_argument('--shapes', default=','.join(shapes), help='the shapes of documents, separated by commas')
+    parser.add_argument('--output', help='the file to write the results to, as JSON')
+    parser.add_argument('--compare', help='the results of a previous run to compare with')
+
+    options = parser.parse_args()
+    results = run(options.size, options.repeat, options.shapes.split(','))
+    headers = ['shape', 'format', 'operation', 'selector', 'seconds']
+    rows    = [
+        [result['shape'] or '-', result['format'] or '-', result['operation'], result['selector'] or '-', '{:.4f}'.format(result['seconds'])]
+        for result in results
+    ]
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = {key(result): result['seconds'] for result in json.load(f)['results']}
+
+        headers.append('ratio')
+
+        for row, result in zip(rows, results):
+            previous = baseline.get(key(result))
+
+            row.append('{:.2f}'.format(result['seconds'] / previous) if previous else '-')
+
+    report('Benchmark suite (size {})'.format(options.size), headers, rows)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(
+                {
+                    'python':  platform.python_version(),
+                    'size':    options.size,
+                    'repeat':  options.repeat,
+                    'results': results,
+                },
+                f,
+                indent=2,
+            )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import os
+
+from unittest import TestCase
+
+from kotoba           import batch
+from kotoba.exception import InvalidDataSourceError, InvalidInputError
+
+class TestBatch(TestCase):
+    def setUp(self):
+        data_path = os.path.join(os.path.dirname(__file__), '../data')
+
+        self.sandbox_path = os.path.join(data_path, 'sandbox.xml')
+        self.locator_path = os.path.join(data_path, 'locator.xml')
+        self.missing_path = os.path.join(data_path, 'missing.xml')
+
+    def test_ordered(self):
+        results = list(batch.query(
+            [self.sandbox_path, self.missing_path, self.locator_path],
+            {'dates': 'status > created_at', 'entities': 'entity[id=poo]'},
+            workers=2,
+        ))
+
+        self.assertEqual([result.path for result in results], [self.sandbox_path, self.missing_path, self.locator_path])
+
+        self.assertEqual(len(results[0].matches['dates']), 2)
+        self.assertEqual(results[0].matches['entities'], [])
+        self.assertIsNone(results[0].error)
+
+        self.assertIsNone(results[1].matches)
+        self.assertIsInstance(results[1].error, InvalidDataSourceError)
+
+        self.assertEqual(results[2].matches['entities'], [{
+            'name':       'entity',
+            'attributes': {'id': 'poo', 'class': 'dummy.core.PlainOldObject'},
+            'data':       'python soup',
+        }])
+
+    def test_unordered_with_chunks(self):
+        paths   = [self.sandbox_path, self.locator_path] * 5
+        results = list(batch.query(paths, 'param', workers=2, ordered=False, chunksize=3))
+
+        self.assertEqual(sorted(result.path for result in results), sorted(paths))
+        self.assertEqual(sum(len(result.matches['param']) for result in results), 35)
+
+    def test_in_process(self):
+        results = batch.query(iter([self.locator_path]), ['param[type=int]'], workers=0)
+
+        self.assertEqual([match['data'] for match in next(results).matches['param[type=int]']], ['2', '5', '7'])
+
+    def test_parse_error(self):
+        result = next(batch.query([__file__], 'a', workers=0))
+
+        self.assertIsInstance(result.error, InvalidDataSourceError)
+        self.assertIn(__file__, str(result.error))
+
+    def test_invalid_selectors(self):
+        with self.assertRaises(InvalidInputError):
+            batch.query([self.sandbox_path], [])
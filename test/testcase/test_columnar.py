@@ -0,0 +1,126 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.columnar  import ColumnarDocument, NodeView
+from kotoba.exception import InvalidInputError
+
+def describe(nodes):
+    return [(node.name(), dict(node.attributes()), node.data(), node.level(), node.position(), node.type_position()) for node in nodes]
+
+class TestColumnar(TestCase):
+    def setUp(self):
+        self.sandbox_path  = os.path.join(os.path.dirname(__file__), '../data/sandbox.xml')
+        self.locator_path  = os.path.join(os.path.dirname(__file__), '../data/locator.xml')
+        self.document_path = os.path.join(os.path.dirname(__file__), '../data/sandbox_document.json')
+
+    def test_same_results_as_minidom(self):
+        selectors = [
+            'created_at', 'status > user', 'user created_at', 'created_at[tz]', 'status:first-child',
+            'status:last-child', 'user > :only-child', 'created_at + id', 'created_at ~ user lang',
+            'status > created_at + user > created_at', 'status + status', 'elem_a:nth-of-type(2)',
+            'elem_x + elem_a ~ status', 'status > :first-child', '*',
+        ]
+
+        for file_path in (self.sandbox_path, self.locator_path):
+            dom      = load_from_file(file_path)
+            columnar = load_from_file(file_path, mode='columnar')
+
+            self.assertIsInstance(columnar, NodeView)
+            self.assertEqual(columnar.name(), dom.name())
+            self.assertEqual(columnar.data(), dom.data())
+
+            for selector in selectors + ['entity > param[type="int"]', 'entity[id^="poo"] param']:
+                self.assertEqual(describe(columnar.find(selector)), describe(dom.find(selector)), selector)
+
+    def test_children(self):
+        dom      = load_from_file(self.locator_path)
+        columnar = load_from_file(self.locator_path, mode='columnar')
+
+        self.assertEqual(describe(columnar.children()), describe(dom.children()))
+        self.assertEqual(describe(columnar.children('entity[class$="Parameters"]')), describe(dom.children('entity[class$="Parameters"]')))
+        self.assertEqual(
+            [(node.is_data(), node.original_value()) for node in columnar.children(None, True)],
+            [(node.is_data(), node.original_value()) for node in dom.children(None, True)],
+        )
+
+    def test_siblings(self):
+        for file_path in (self.sandbox_path, self.locator_path):
+            dom      = load_from_file(file_path).find('*')
+            columnar = load_from_file(file_path, mode='columnar').find('*')
+
+            self.assertEqual(
+                [(node.sibling_count(), node.previous_element() and node.previous_element().name()) for node in columnar],
+                [(node.sibling_count(), node.previous_element() and node.previous_element().name()) for node in dom],
+            )
+
+        root = ColumnarDocument.from_string('<r>{}</r>'.format('<a/><b/>' * 5000)).root()
+
+        self.assertEqual(len(root.find('a + b')), 5000)
+        self.assertEqual(len(root.find('b:last-child')), 1)
+        self.assertEqual(len(root.find(':only-child')), 0)
+
+    def test_attribute_values_are_not_cached(self):
+        document = ColumnarDocument.from_string('<r>{}</r>'.format(''.join('<item id="{}"/>'.format(index) for index in range(1000))))
+
+        self.assertEqual(len(document.root().find('item[id="5"]')), 1)
+        self.assertEqual(document.root().find('item')[7].attribute('id'), '7')
+        self.assertFalse(document.root().find('item')[7].has_attribute('name'))
+        self.assertEqual(sorted(document.snapshot._cache.values()), ['id', 'item'])
+
+    def test_views(self):
+        root   = load_from_file(self.sandbox_path, mode='columnar')
+        first  = root.find('status')[0]
+        second = root.find('status')[0]
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+        self.assertEqual(first.parent(), root)
+        self.assertIsNone(root.parent())
+        self.assertEqual(len(root.find('status user')), len(set(root.find('status user'))))
+
+    def test_merging_documents(self):
+        first  = ColumnarDocument.from_string('<r><a>1</a></r>').root()
+        second = ColumnarDocument.from_string('<r><a>2</a></r>').root()
+        dom    = load_from_file(self.sandbox_path)
+        merged = first.find('a')
+
+        merged.extend(second.find('a'))
+
+        self.assertEqual(len(merged), 2)
+        self.assertEqual(merged.data(), '12')
+
+        merged.extend(dom.find('*'))
+        merged.extend(first.find('a'))
+
+        self.assertEqual(len(merged), 2 + len(dom.find('*')))
+        self.assertNotEqual(first.find('a')[0].guid(), second.find('a')[0].guid())
+
+    def test_cdata_and_comments(self):
+        root = ColumnarDocument.from_string('<a>x<!-- hidden -->y<b><![CDATA[<c/>]]></b><?keep it?></a>').root()
+
+        self.assertEqual([node.name() for node in root.children(None, True)], ['#text', '#text', 'b', 'keep'])
+        self.assertEqual(root.find('b').data(), '<c/>')
+        self.assertEqual(root.data(), 'xy<c/>')
+        self.assertEqual(root.data(2), 'xy')
+        self.assertEqual(list(root.iter_text()), ['x', 'y', '<c/>'])
+        self.assertEqual(len(root.find('c')), 0)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for _ in range(2): # written, then reused
+                root = load_from_file(self.sandbox_path, mode='columnar', cache=True, cache_dir=cache_dir)
+
+                self.assertEqual(describe(root.find('status > user')), describe(load_from_file(self.sandbox_path).find('status > user')))
+
+    def test_unsupported(self):
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.document_path, mode='columnar')
+
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.sandbox_path, mode='columnar', eager=True)
+
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.sandbox_path, mode='columnar', only='status')
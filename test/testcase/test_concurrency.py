@@ -0,0 +1,100 @@
+import sys
+
+from threading import Barrier, Thread
+from unittest  import TestCase
+
+from kotoba.kotoba import Kotoba
+
+selectors = [
+    'item > price', 'item title', 'tags tag:last-child', 'item[type="3"] + item', 'item:nth-child(7n)', '*',
+]
+
+def generate(items):
+    return '<catalog>{}</catalog>'.format(''.join(
+        '<item id="{0}" type="{1}"><title>Item {0}</title><price>{2}</price><tags><tag>a</tag><tag>b</tag></tags></item>'.format(
+            index, index % 5, index % 100,
+        )
+        for index in range(items)
+    ))
+
+class TestConcurrency(TestCase):
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        self.content         = generate(300)
+
+        sys.setswitchinterval(1e-6) # Switch threads as often as possible.
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def expected(self):
+        document = Kotoba(self.content)
+
+        return {selector: [node.data() for node in document.find(selector)] for selector in selectors}
+
+    def run_threads(self, document, count=8):
+        barrier = Barrier(count)
+        results = [None] * count
+
+        def query(position):
+            barrier.wait()
+
+            results[position] = {
+                selector: [node.data() for node in document.find(selector)]
+                for selector in selectors[position % len(selectors):] + selectors[:position % len(selectors)]
+            }
+
+        threads = [Thread(target=query, args=(position,)) for position in range(count)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_lazy_tree(self):
+        expected = self.expected()
+
+        for _ in range(3):
+            for result in self.run_threads(Kotoba(self.content)):
+                self.assertEqual(result, expected)
+
+    def test_frozen_tree(self):
+        expected = self.expected()
+        document = Kotoba(self.content)
+
+        self.assertIs(document.freeze(), document)
+        self.assertTrue(all(node._is_children_initialized for node in document.find('*')))
+
+        for result in self.run_threads(document):
+            self.assertEqual(result, expected)
+
+    def test_unique_guids(self):
+        guids = []
+
+        def create():
+            document = Kotoba(self.content)
+
+            guids.extend(node.guid() for node in document.freeze().find('*'))
+
+        threads = [Thread(target=create) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(guids), len(set(guids)))
+
+    def test_lock_per_document(self):
+        first  = Kotoba(self.content)
+        second = Kotoba(self.content)
+
+        first.find('tag')
+        second.find('tag')
+
+        self.assertIsNot(first._lock, second._lock)
+        self.assertTrue(all(node._lock is first._lock for node in first.find('*')))
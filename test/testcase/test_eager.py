@@ -0,0 +1,59 @@
+import os
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.driver    import DetachedDriver
+from kotoba.exception import InvalidInputError
+from kotoba.kotoba    import EagerKotoba
+
+def describe(nodes):
+    return [(node.name(), dict(node.attributes()), node.data()) for node in nodes]
+
+class TestEager(TestCase):
+    def setUp(self):
+        self.sandbox_path    = os.path.join(os.path.dirname(__file__), '../data/sandbox.xml')
+        self.collection_path = os.path.join(os.path.dirname(__file__), '../data/sandbox_collection.json')
+        self.document_path   = os.path.join(os.path.dirname(__file__), '../data/sandbox_document.json')
+
+    def assertDetached(self, root):
+        self.assertIsInstance(root, EagerKotoba)
+
+        nodes = [root]
+
+        while nodes:
+            node = nodes.pop()
+
+            self.assertIsInstance(node.node(), DetachedDriver)
+            self.assertTrue(node._is_children_initialized)
+
+            nodes.extend(node.children(None, True))
+
+    def test_xml(self):
+        for options in ({}, {'driver': 'etree'}, {'only': 'status'}):
+            lazy  = load_from_file(self.sandbox_path, **options)
+            eager = load_from_file(self.sandbox_path, eager=True, **options)
+
+            self.assertDetached(eager)
+
+            for selector in ['created_at', 'status > user', 'user created_at', 'created_at[tz]', 'status:first-child', 'created_at + id']:
+                self.assertEqual(describe(eager.find(selector)), describe(lazy.find(selector)), selector)
+
+            self.assertEqual(eager.data(), lazy.data())
+            self.assertEqual(eager.data(max_chars=20), lazy.data(max_chars=20))
+
+    def test_json(self):
+        for path in (self.collection_path, self.document_path):
+            for mode in ('dom', 'mmap'):
+                lazy  = load_from_file(path, mode=mode)
+                eager = load_from_file(path, mode=mode, eager=True)
+
+                self.assertDetached(eager)
+                self.assertEqual(eager.original_value(), lazy.original_value())
+
+                for selector in ['name', '[name=Japanese] since', '[id="2"] name', '> languages']:
+                    self.assertEqual(describe(eager.find(selector)), describe(lazy.find(selector)), selector)
+
+    def test_unsupported(self):
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.sandbox_path, mode='stream', eager=True)
@@ -0,0 +1,56 @@
+import os
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.driver    import ElementTreeDriver, XMLDriver
+from kotoba.exception import InvalidInputError
+from kotoba.kotoba    import Kotoba
+
+class TestElementTreeDriver(TestCase):
+    selectors = [
+        'created_at', 'status > created_at', 'user created_at', 'status lang', '*', 'status:last-child',
+        'elem_a + elem_x', 'entity[id=poo]', 'entity > param[type=int]', 'param:nth-child(2)', ':empty',
+    ]
+
+    def setUp(self):
+        self.paths = [
+            os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'),
+            os.path.join(os.path.dirname(__file__), '../data/locator.xml'),
+        ]
+
+    def test_loading(self):
+        document = load_from_file(self.paths[0], driver='etree')
+
+        self.assertIsInstance(document.node(), ElementTreeDriver)
+        self.assertEqual(document.name(), 'statuses')
+        self.assertEqual(document.attributes(), {'type': 'array'})
+
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.paths[0], driver='unknown')
+
+    def test_same_result_as_minidom(self):
+        for path in self.paths:
+            minidom = load_from_file(path)
+            etree   = load_from_file(path, driver='etree')
+
+            self.assertEqual(etree.data(), minidom.data())
+
+            for selector in self.selectors:
+                expected = [(node.name(), node.attributes(), node.data()) for node in minidom.find(selector)]
+                actual   = [(node.name(), node.attributes(), node.data()) for node in etree.find(selector)]
+
+                self.assertEqual(actual, expected, selector)
+
+    def test_data_blocks(self):
+        document = Kotoba('<r>a<b>c</b>d<!-- e --><f/>g</r>', driver='etree')
+        adjacent = document.children(None, True)
+
+        self.assertEqual([node.is_data() for node in adjacent], [True, False, True, False, True])
+        self.assertEqual(document.data(), 'acdg')
+        self.assertEqual(len(document.children()), 2)
+
+    def test_constructor_with_content(self):
+        self.assertIsInstance(Kotoba('<r><a/></r>').node(), XMLDriver)
+        self.assertIsInstance(Kotoba('<r><a/></r>', driver='etree').node(), ElementTreeDriver)
+        self.assertEqual(len(Kotoba('<r><a/><b><a/></b></r>', driver='etree').find('a')), 2)
@@ -0,0 +1,38 @@
+import os
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.exception import InvalidSelectorError
+from kotoba.kami      import Kami
+
+class TestFindMany(TestCase):
+    def setUp(self):
+        self.x = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+        self.y = load_from_file(os.path.join(os.path.dirname(__file__), '../data/locator.xml'))
+
+    def test_same_result_as_find(self):
+        selectors = {
+            'created_at': 'status created_at',
+            'children':   'status > created_at',
+            'user':       'statuses user[id]',
+            'any':        'user *',
+            'siblings':   'created_at ~ text',
+            'adjacent':   'created_at + id',
+            'first':      'status > :first-child',
+            'not':        'status > *:not(user)',
+            'missing':    'nothing here',
+        }
+
+        for root in (self.x, self.y, self.x.find('status')[0]):
+            results = root.find_many(selectors)
+
+            self.assertEqual(list(results), list(selectors))
+
+            for key, selector in selectors.items():
+                self.assertIsInstance(results[key], Kami)
+                self.assertEqual([node.guid() for node in results[key]], [node.guid() for node in root.find(selector)], selector)
+
+    def test_invalid_selector(self):
+        with self.assertRaises(InvalidSelectorError):
+            self.x.find_many({'siblings': '+ status'})
@@ -0,0 +1,70 @@
+import os
+
+from unittest import TestCase
+
+from kotoba       import load_from_file
+from kotoba.index  import DocumentIndex
+from kotoba.parser import selector
+
+class TestIndex(TestCase):
+    selectors = [
+        'created_at', 'status created_at', 'user created_at', 'status > created_at', 'status lang',
+        'status > lang', '> status', '> status > user', 'entity[id=poo]', 'entity[id="poow-1"] > param',
+        '[type=int]', 'param[name]', 'entity [name=b]', '*', 'status *', 'unknown', '[unknown]',
+    ]
+
+    def setUp(self):
+        self.paths = [
+            os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'),
+            os.path.join(os.path.dirname(__file__), '../data/locator.xml'),
+        ]
+
+    def test_same_result_as_traversal(self):
+        for path in self.paths:
+            plain   = load_from_file(path)
+            indexed = load_from_file(path)
+
+            self.assertIsNone(indexed.index())
+            self.assertIsInstance(indexed.build_index(), DocumentIndex)
+
+            for selector in self.selectors:
+                expected = [node.data() for node in plain.find(selector)]
+                actual   = [node.data() for node in indexed.find(selector)]
+
+                self.assertEqual(actual, expected, selector)
+
+    def test_search_from_descendant(self):
+        document = load_from_file(self.paths[0])
+        status   = document.children('status')[1]
+
+        document.build_index()
+
+        self.assertIs(status.index(), document.index())
+        self.assertIs(status.root(), document)
+        self.assertEqual([node.data() for node in status.find('created_at')], [
+            'Wed Mar 17 13:43:48 +0000 2010',
+            'Wed Mar 07 22:23:19 +0000 2007',
+        ])
+        self.assertEqual(len(status.find('> created_at')), 1)
+        self.assertEqual(len(status.find('status created_at')), 0)
+        self.assertEqual(len(status.find('user > created_at[tz=utc]')), 1)
+
+    def test_candidates(self):
+        document = load_from_file(self.paths[1])
+        index    = document.build_index()
+
+        self.assertEqual(len(index.candidates(selector('param'), document)), 7)
+        self.assertEqual(len(index.candidates(selector('param[type=int]'), document)), 3)
+        self.assertEqual(len(index.candidates(selector('param'), document.children()[1])), 3)
+        self.assertEqual(index.candidates(selector('param[unknown]'), document), [])
+        self.assertIsNone(index.candidates(selector('*'), document))
+
+    def test_containers_are_not_indexed_by_value(self):
+        document = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox_document.json'))
+        index    = document.build_index()
+
+        # The items of "languages" are objects, so they are only indexed by name.
+        self.assertEqual(sorted(value for name, value in index._values), ['1989', '2004', 'English', 'Japanese', 'Thai', 'born'])
+        self.assertEqual(len(index.candidates(selector('[since="1989"]'), document)), 1)
+        self.assertEqual(len(index.candidates(selector('[1="English"]'), document)), 1)
+        self.assertEqual(len(document.find('[1="English"]')), 0)
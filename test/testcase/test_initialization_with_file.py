@@ -2,8 +2,22 @@ import os
 from unittest import TestCase
 
 from kotoba        import load_from_file
+from kotoba.driver import XMLDriver
 from kotoba.kotoba import Kotoba, Kami
 
+class LegacyXMLDriver(XMLDriver):
+    """ Attach the children as the drivers written for 3.2 do """
+    @staticmethod
+    def initialize_children(kotoba_node):
+        for original_child_node in kotoba_node._node.children():
+            child_node = kotoba_node.__class__(LegacyXMLDriver(original_child_node), kotoba_node.level() + 1)
+
+            child_node.parent(kotoba_node)
+            kotoba_node.adjacents().append(child_node)
+
+            if child_node.is_element():
+                kotoba_node._children.append(child_node)
+
 class TestInitializationWithFile(TestCase):
     def setUp(self):
         file_path = os.path.join(os.path.dirname(__file__), '../data/sandbox.xml')
@@ -36,3 +50,29 @@ class TestInitializationWithFile(TestCase):
         self.x.data()
         self.assertTrue(self.x._is_children_initialized)
 
+    def test_compact_nodes(self):
+        leaf = self.x.find('lang')[0]
+
+        self.assertFalse(hasattr(self.x, '__dict__'))
+        self.assertFalse(hasattr(self.x.node(), '__dict__'))
+        self.assertIsNone(leaf._elements)
+        self.assertIsInstance(leaf.children(), Kami)
+        self.assertEqual(leaf.attributes(), {})
+        self.assertIs(leaf.parent().parent(), self.x.children('status')[0])
+
+    def test_driver_appending_children(self):
+        x = Kotoba(LegacyXMLDriver.from_string('<r><a/>text<b><c/></b><a/></r>'))
+
+        self.assertEqual([node.name() for node in x.children()], ['a', 'b', 'a'])
+        self.assertEqual(len(x.adjacents()), 4)
+        self.assertEqual([node.position() for node in x.children()], [0, 1, 2])
+        self.assertEqual(len(x.find('b + a')), 1)
+        self.assertEqual(len(x.find('a:last-child')), 1)
+        self.assertIs(x.find('c')[0].parent().parent(), x)
+        self.assertIs(x.find('c')[0]._lock, x._lock)
+
+    def test_drivers_from_the_package(self):
+        import kotoba
+
+        self.assertIs(kotoba.XMLDriver, XMLDriver)
+        self.assertIsInstance(Kotoba(kotoba.XMLDriver.from_string('<r/>')), Kotoba)
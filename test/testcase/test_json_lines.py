@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import types
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.exception import InvalidDataSourceError, InvalidInputError
+from kotoba.kotoba    import Kotoba
+from kotoba.stream    import JSONLinesStream
+
+class TestJSONLines(TestCase):
+    def setUp(self):
+        records = [
+            {'id': 1, 'name': 'Python', 'tags': ['snake']},
+            {'id': 2, 'name': 'Elephant', 'tags': []},
+            {'id': 3, 'name': 'Ruby', 'tags': ['gem', 'stone']},
+        ]
+
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as f:
+            f.write('\n'.join(json.dumps(record) for record in records[:2]))
+            f.write('\n\n') # blank lines are skipped.
+            f.write(json.dumps(records[2]))
+
+        self.path = f.name
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_loading(self):
+        x = load_from_file(self.path)
+
+        self.assertIsInstance(x, JSONLinesStream)
+        self.assertIsInstance(x.find('name'), types.GeneratorType)
+
+    def test_records(self):
+        records = list(load_from_file(self.path).records())
+
+        self.assertEqual(len(records), 3)
+        self.assertIsInstance(records[0], Kotoba)
+        self.assertEqual(records[2].find('> name').data(), 'Ruby')
+
+    def test_find(self):
+        x = load_from_file(self.path)
+
+        self.assertEqual([node.data() for node in x.find('name')], ['Python', 'Elephant', 'Ruby'])
+        self.assertEqual([node.data() for node in x.find('tags > *')], ['snake', 'gem', 'stone'])
+
+    def test_parallel_decoding(self):
+        x = JSONLinesStream(self.path, workers=2, chunksize=1)
+
+        self.assertEqual([node.data() for node in x.find('id')], [1, 2, 3])
+
+    def test_malformed_line(self):
+        with open(self.path, 'a') as f:
+            f.write('\n{"id": 4,')
+
+        with self.assertRaises(InvalidDataSourceError) as context:
+            list(load_from_file(self.path).find('id'))
+
+        self.assertIn('Line 5', str(context.exception))
+
+    def test_mmap_mode(self):
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.path, mode='mmap')
@@ -0,0 +1,45 @@
+import os
+
+from unittest import TestCase
+
+from kotoba      import load_from_file
+from kotoba.kami import Kami
+
+class TestKami(TestCase):
+    def setUp(self):
+        self.x = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+
+    def test_append_without_duplicates(self):
+        nodes = self.x.children()
+        kami  = Kami()
+
+        kami.append(nodes[1])
+        kami.append(nodes[0])
+        kami.append(nodes[1])
+
+        self.assertEqual(list(kami), [nodes[1], nodes[0]])
+
+    def test_extend_keeps_order_without_duplicates(self):
+        nodes = self.x.children()
+        kami  = Kami()
+
+        kami.extend(nodes)
+        kami.extend(nodes)
+        kami.extend(reversed(nodes))
+
+        self.assertEqual(list(kami), list(nodes))
+
+        partial = Kami()
+
+        partial.append(nodes[3])
+        partial.extend([nodes[0], nodes[3], nodes[0], nodes[2]])
+
+        self.assertEqual(list(partial), [nodes[3], nodes[0], nodes[2]])
+
+    def test_extend_from_results(self):
+        kami = Kami()
+
+        kami.extend(self.x.find('created_at'))
+        kami.extend(self.x.find('user created_at'))
+
+        self.assertEqual(len(kami), 4)
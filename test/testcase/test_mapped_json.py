@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.columnar  import MappedJSONDocument, MappedJSONView
+from kotoba.exception import InvalidDataSourceError, InvalidInputError
+from kotoba.jsonmap   import JSONMap
+from kotoba.kotoba    import Kotoba
+
+def describe(nodes):
+    return [
+        (node.name(), dict(node.attributes()), node.data(), node.is_data(), node.level(), node.position(), node.type_position())
+        for node in nodes
+    ]
+
+class TestMappedJSON(TestCase):
+    def setUp(self):
+        self.collection_path = os.path.join(os.path.dirname(__file__), '../data/sandbox_collection.json')
+        self.document_path   = os.path.join(os.path.dirname(__file__), '../data/sandbox_document.json')
+
+        self.x = load_from_file(self.collection_path, mode='mmap')
+        self.y = load_from_file(self.document_path, mode='mmap')
+
+    def test_loading(self):
+        self.assertIsInstance(self.x, MappedJSONView)
+        self.assertEqual(self.x.name(), 'root')
+        self.assertIsNone(self.x.parent())
+
+    def test_queries(self):
+        self.assertEqual(self.x.find('0 name').data(), 'Python')
+        self.assertEqual(self.x.find('[id=2] name').data(), 'Elephant')
+        self.assertEqual(self.x.find('* name').data(), 'PythonElephantRuby')
+        self.assertEqual(self.y.find('> name').data(), 'Juti')
+        self.assertEqual(self.y.find('languages [name=Japanese] since').data(), 2004)
+
+    def test_same_values_as_dom_mode(self):
+        document = load_from_file(self.document_path)
+
+        self.assertEqual(self.y.original_value(), document.original_value())
+        self.assertEqual(self.y.find('languages')[0].original_value(), document.find('languages')[0].original_value())
+
+    def test_same_results_as_dom_mode(self):
+        for path in (self.collection_path, self.document_path):
+            dom    = load_from_file(path)
+            mapped = load_from_file(path, mode='mmap')
+
+            self.assertEqual(describe(mapped.children(None, True)), describe(dom.children(None, True)))
+            self.assertEqual(list(mapped.iter_text()), list(dom.iter_text()))
+
+            for selector in ['*', 'name', '0', '1 > *', '> languages', '[name=Japanese] since', 'languages > :last-child', 'id + name', '* ~ name']:
+                self.assertEqual(describe(mapped.find(selector)), describe(dom.find(selector)), selector)
+
+    def test_structural_index(self):
+        document = JSONMap(b' {"a": [1, {"b": "x"}, []], "c": {}, "d": null} ')
+
+        self.assertEqual(document.size, 8)
+        self.assertEqual([document.name(index) for index in range(8)], ['root', 'a', '0', '1', 'b', '2', 'c', 'd'])
+        self.assertEqual(list(document.parents), [-1, 0, 1, 1, 3, 1, 0, 0])
+        self.assertEqual(list(document.ends), [7, 5, 2, 4, 4, 5, 6, 7])
+        self.assertEqual([document.value(index) for index in (2, 5, 6, 7)], [1, [], {}, None])
+        self.assertEqual(list(document.children(0)), [1, 6, 7])
+
+    def test_views_are_not_kept(self):
+        document = MappedJSONDocument.from_file(self.document_path)
+        first    = document.root().find('since')
+        second   = document.root().find('since')
+
+        self.assertEqual(first, second)
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(first[0].parent().parent(), document.root().children('languages')[0])
+
+    def test_attributes_are_decoded_on_demand(self):
+        attributes = self.y.find('languages > *')[1].attributes()
+
+        self.assertEqual(sorted(attributes), ['name', 'since'])
+        self.assertEqual(attributes['since'], '1989')
+        self.assertEqual(self.y.find('> id')[0].attributes(), {}) # scalars have no members
+
+    def test_escaped_strings(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            f.write('{"a \\"b\\"": {"c": "x]}\\\\"}, "d": [1, 2.5, true, null, []]}')
+
+        try:
+            document = load_from_file(f.name, mode='mmap')
+
+            self.assertEqual(document.find('c').data(), 'x]}\\')
+            self.assertEqual([child.original_value() for child in document.find('> d')[0].children()], [1, 2.5, True, None, []])
+            self.assertEqual(document.children()[0].name(), 'a "b"')
+        finally:
+            os.unlink(f.name)
+
+    def test_malformed_data(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            f.write('{"a": 1 "b": 2}')
+
+        try:
+            with self.assertRaises(InvalidDataSourceError):
+                load_from_file(f.name, mode='mmap')
+        finally:
+            os.unlink(f.name)
+
+        for content in (b'', b'{"a": [1, 2}', b'{"a": 1,}', b'[1] 2', b'{"a" 1}', b'{"a": "b}', b'[tru]'):
+            with self.assertRaises(InvalidDataSourceError):
+                MappedJSONDocument.from_string(content).root().original_value()
+
+    def test_eager(self):
+        x = load_from_file(self.document_path, mode='mmap', eager=True)
+
+        self.assertIsInstance(x, Kotoba)
+        self.assertEqual(x.original_value(), self.y.original_value())
+
+    def test_xml_is_not_supported(self):
+        with self.assertRaises(InvalidInputError):
+            load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'), mode='mmap')
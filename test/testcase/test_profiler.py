@@ -0,0 +1,62 @@
+import json
+import os
+
+from unittest import TestCase
+
+import kotoba
+
+from kotoba        import load_from_file, misc
+from kotoba.common import get_trace
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        self.x = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+
+    def test_report(self):
+        with kotoba.profile() as p:
+            self.x.find('user > created_at[tz]')
+            self.x.find('user > created_at[tz]')
+            self.x.find('lang')
+
+        self.assertFalse(misc.debug_mode)
+        self.assertIsNone(get_trace())
+
+        report  = p.to_dict()
+        records = {record['selector']: record for record in report['selectors']}
+
+        self.assertEqual(list(records), ['user > created_at[tz]', 'lang'])
+
+        record = records['user > created_at[tz]']
+
+        self.assertEqual(record['calls'], 2)
+        self.assertEqual(record['found'], 2)
+        self.assertEqual(record['merges'], 2)
+        self.assertGreater(record['initializations'], 0) # the tree is loaded by the first search.
+        self.assertGreater(record['time'], 0)
+        self.assertEqual([step['selector'] for step in record['steps']], ['user', 'created_at[tz]'])
+        self.assertEqual([step['combinator'] for step in record['steps']], [None, '>'])
+        self.assertGreater(record['steps'][1]['match_calls'], 0)
+        self.assertGreater(record['steps'][1]['attribute_checks'], 0)
+        self.assertEqual(record['steps'][1]['nodes_visited'], record['steps'][1]['match_calls'] // 2)
+
+        self.assertEqual(json.loads(p.to_json()), report)
+
+    def test_outside_of_find(self):
+        with kotoba.profile() as p:
+            self.x.children('status')
+
+        record, = p.to_dict()['selectors']
+
+        self.assertIsNone(record['selector'])
+        self.assertEqual(record['steps'][0]['selector'], 'status')
+        self.assertEqual(record['steps'][0]['match_calls'], len(self.x.children()))
+
+    def test_nested_profiles(self):
+        with kotoba.profile() as outer:
+            with kotoba.profile() as inner:
+                self.x.find('lang')
+
+            self.x.find('status')
+
+        self.assertEqual([record['selector'] for record in inner.to_dict()['selectors']], ['lang'])
+        self.assertEqual([record['selector'] for record in outer.to_dict()['selectors']], ['status'])
@@ -0,0 +1,85 @@
+import os
+
+from unittest        import TestCase
+from xml.dom.minidom import parseString
+
+from kotoba           import load_from_file
+from kotoba.driver    import XMLDriver
+from kotoba.exception import InvalidSelectorError, LexicalError
+from kotoba.kotoba    import Kotoba
+from kotoba.selector  import PseudoClass
+
+class TestPseudoClass(TestCase):
+    def setUp(self):
+        self.x = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+        self.y = Kotoba(XMLDriver(parseString(
+            '<r><l id="1"><i id="2"/><i id="3"><b id="4"/></i><b id="5"/><i id="6"></i><i id="7">text</i></l></r>'
+        ).documentElement))
+
+    def ids(self, raw_selector):
+        return [node.attribute('id') for node in self.y.find(raw_selector)]
+
+    def test_parse_nth(self):
+        self.assertEqual(PseudoClass.parse_nth('odd'), (2, 1))
+        self.assertEqual(PseudoClass.parse_nth('even'), (2, 0))
+        self.assertEqual(PseudoClass.parse_nth('3'), (0, 3))
+        self.assertEqual(PseudoClass.parse_nth('n'), (1, 0))
+        self.assertEqual(PseudoClass.parse_nth('-n + 3'), (-1, 3))
+        self.assertEqual(PseudoClass.parse_nth('2n-1'), (2, -1))
+
+        with self.assertRaises(LexicalError):
+            PseudoClass.parse_nth('2x+1')
+
+        with self.assertRaises(LexicalError):
+            PseudoClass.parse(':hover')
+
+    def test_root_and_empty(self):
+        self.assertEqual(self.ids(':root > l'), ['1'])
+        self.assertEqual(self.ids('r:root > l > i'), ['2', '3', '6', '7'])
+        self.assertEqual(self.ids(':root b'), ['4', '5'])
+        self.assertEqual(self.ids(':root i > b'), ['4'])
+        self.assertEqual(self.ids(':root > i'), [])
+        self.assertEqual(self.ids('l:root > i'), [])
+        self.assertEqual(self.y.find('l')[0].find(':root i'), [])
+        self.assertEqual(self.ids(':not(:root)'), ['1', '2', '3', '4', '5', '6', '7'])
+        self.assertEqual(self.ids('i:empty'), ['2', '6'])
+        self.assertEqual(self.ids(':empty'), ['2', '4', '5', '6'])
+
+    def test_children(self):
+        self.assertEqual(self.ids('l > :first-child'), ['2'])
+        self.assertEqual(self.ids(':last-child'), ['1', '4', '7'])
+        self.assertEqual(self.ids(':only-child'), ['1', '4'])
+        self.assertEqual(self.ids('l > i:first-child + i'), ['3'])
+
+    def test_nth(self):
+        self.assertEqual(self.ids('l > :nth-child(odd)'), ['2', '5', '7'])
+        self.assertEqual(self.ids('l > :nth-child(2n)'), ['3', '6'])
+        self.assertEqual(self.ids('l > :nth-child(-n+2)'), ['2', '3'])
+        self.assertEqual(self.ids('l > :nth-child(4)'), ['6'])
+        self.assertEqual(self.ids('i:nth-of-type(4)'), ['7'])
+        self.assertEqual(self.ids('b:nth-of-type(1)'), ['4', '5'])
+        self.assertEqual(self.ids('l > i:nth-of-type(2n+1)'), ['2', '6'])
+
+    def test_not(self):
+        self.assertEqual(self.ids('l > :not(i)'), ['5'])
+        self.assertEqual(self.ids('i:not(:first-child):not(:last-child)'), ['3', '6'])
+        self.assertEqual(self.ids('i:not([id="3"])'), ['2', '6', '7'])
+
+    def test_sandbox(self):
+        self.assertEqual(len(self.x.find('status > :first-child')), 2)
+        self.assertEqual(self.x.find('elem_a:nth-of-type(2)')[0].position(), 3)
+        self.assertEqual(len(self.x.find('status:last-child')), 1)
+        self.assertEqual(len(self.x.find('user > :only-child')), 1)
+        self.assertEqual(len(self.x.find(':root > status')), len(self.x.children('status')))
+        self.assertEqual(len(self.x.find(':root status')), len(self.x.find('status')))
+        self.assertEqual(len(self.x.find(':root status')), len(self.x.find_many({'a': ':root status'})['a']))
+
+        self.x.build_index()
+
+        self.assertEqual(len(self.x.find(':root > status')), len(self.x.children('status')))
+
+    def test_stream(self):
+        stream = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'), mode='stream')
+
+        with self.assertRaises(InvalidSelectorError):
+            list(stream.find('status:first-child'))
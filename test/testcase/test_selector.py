@@ -1,7 +1,11 @@
-from unittest import TestCase
+from unittest        import TestCase
+from xml.dom.minidom import parseString
 
-from kotoba.kotoba   import Kotoba
-from kotoba.parser   import selector
+from kotoba.driver    import XMLDriver
+from kotoba.exception import LexicalError
+from kotoba.kotoba    import Kotoba
+from kotoba.parser    import selector
+from kotoba.selector  import Attribute
 
 class TestSelector(TestCase):
     def setUp(self):
@@ -35,4 +39,58 @@ class TestSelector(TestCase):
 
         self.assertEquals(s.name(), 'element')
         self.assertEquals(s.attribute('aname1'), 'avalue1')
-        self.assertEquals(len(s.attributes()), 2)
\ No newline at end of file
+        self.assertEquals(len(s.attributes()), 2)
+
+
+class TestAttributeOperators(TestCase):
+    def setUp(self):
+        self.x = Kotoba(XMLDriver(parseString(
+            '<r>'
+            '<e id="1" class="alpha beta" lang="en-US" href="https://example.com/a.pdf"/>'
+            '<e id="2" class="Alpha" lang="en" href="http://example.org/b.html"/>'
+            '<e id="3" class="gamma" lang="english" title="a b:c]"/>'
+            '</r>'
+        ).documentElement))
+
+    def ids(self, raw_selector):
+        return [node.attribute('id') for node in self.x.find(raw_selector)]
+
+    def test_parse(self):
+        attribute = Attribute.parse('[ lang |= "en" i ]')
+
+        self.assertEqual(attribute.name(), 'lang')
+        self.assertEqual(attribute.operator(), '|=')
+        self.assertEqual(attribute.value(), 'en')
+        self.assertTrue(attribute.ignore_case())
+        self.assertEqual(Attribute.parse("[title='a b']").value(), 'a b')
+
+        for malformed in ['[a=]', '[a b]', '[a i]', '[a~b]', '[a']:
+            with self.assertRaises(LexicalError):
+                Attribute.parse(malformed)
+
+    def test_existence_and_equality(self):
+        self.assertEqual(self.ids('e[title]'), ['3'])
+        self.assertEqual(self.ids('e[class=gamma]'), ['3'])
+        self.assertEqual(self.ids('e[title="a b:c]"]'), ['3'])
+
+    def test_operators(self):
+        self.assertEqual(self.ids('e[class~=beta]'), ['1'])
+        self.assertEqual(self.ids('e[class~="alpha beta"]'), [])
+        self.assertEqual(self.ids('e[lang|=en]'), ['1', '2'])
+        self.assertEqual(self.ids('e[href^=https]'), ['1'])
+        self.assertEqual(self.ids('e[href$=".html"]'), ['2'])
+        self.assertEqual(self.ids('e[href*=example]'), ['1', '2'])
+        self.assertEqual(self.ids('e[href^=""]'), [])
+
+    def test_case_insensitive_flag(self):
+        self.assertEqual(self.ids('e[class=alpha]'), [])
+        self.assertEqual(self.ids('e[class=alpha i]'), ['2'])
+        self.assertEqual(self.ids('e[class~=ALPHA i]'), ['1', '2'])
+        self.assertEqual(self.ids('e[lang|=EN i]'), ['1', '2'])
+        self.assertEqual(self.ids('e[class=Alpha s]'), ['2'])
+
+    def test_with_index(self):
+        self.x.build_index()
+
+        self.assertEqual(self.ids('e[class=alpha i]'), ['2'])
+        self.assertEqual(self.ids('e[lang|=en]'), ['1', '2'])
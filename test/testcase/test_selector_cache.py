@@ -0,0 +1,91 @@
+import os
+
+from threading import Thread
+from unittest  import TestCase
+
+from kotoba        import load_from_file
+from kotoba.parser import SelectorCache, cache, cache_info, compile_selector, selector, set_cache_size
+
+class TestSelectorCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        set_cache_size(256)
+        cache.clear()
+
+    def test_hit_and_miss(self):
+        compiled = compile_selector('status > created_at')
+
+        self.assertIs(compile_selector('status > created_at'), compiled)
+        self.assertEqual(cache_info().hits, 1)
+        self.assertEqual(cache_info().misses, 1)
+        self.assertEqual(cache_info().currsize, 1)
+
+    def test_immutable_chain(self):
+        compiled = compile_selector('entity[id=poo] param')
+
+        self.assertTrue(compiled.frozen())
+        self.assertTrue(compiled.next().frozen())
+        self.assertIsInstance(compiled.attributes(), tuple)
+
+        compiled.next().next(selector('other'))
+        compiled.next().kind(2)
+
+        self.assertIsNone(compiled.next().next())
+        self.assertEqual(len(compiled.chain()), 2)
+
+    def test_lru_eviction(self):
+        local_cache = SelectorCache(2)
+
+        a = local_cache.get('a')
+        local_cache.get('b')
+        local_cache.get('a')
+        local_cache.get('c') # evicts "b"
+
+        self.assertIs(local_cache.get('a'), a)
+        self.assertEqual(local_cache.info().currsize, 2)
+
+        local_cache.get('b')
+
+        self.assertEqual(local_cache.info().misses, 4)
+
+        local_cache.resize(1)
+
+        self.assertEqual(local_cache.info().currsize, 1)
+
+    def test_disabled(self):
+        set_cache_size(0)
+
+        self.assertIsNot(compile_selector('a'), compile_selector('a'))
+        self.assertEqual(cache_info().currsize, 0)
+
+    def test_public_api_uses_cache(self):
+        document = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+
+        document.find('status created_at')
+        document.find('status created_at')
+        document.children('status')
+
+        self.assertEqual(cache_info().hits, 1)
+        self.assertEqual(cache_info().misses, 2)
+
+    def test_concurrent_access(self):
+        local_cache = SelectorCache(8)
+
+        def worker():
+            for i in range(500):
+                local_cache.get('item[id={}] price'.format(i % 16))
+
+        threads = [Thread(target=worker) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        info = local_cache.info()
+
+        self.assertEqual(info.hits + info.misses, 4000)
+        self.assertEqual(info.currsize, 8)
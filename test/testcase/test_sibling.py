@@ -0,0 +1,62 @@
+import os
+import time
+
+from unittest        import TestCase
+from xml.dom.minidom import parseString
+
+from kotoba           import load_from_file
+from kotoba.driver    import XMLDriver
+from kotoba.exception import InvalidSelectorError
+from kotoba.kotoba    import Kotoba
+
+class TestSiblingCombinators(TestCase):
+    def setUp(self):
+        self.x = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+
+    def test_positions(self):
+        self.assertEqual([node.position() for node in self.x.children()], list(range(9)))
+
+    def test_immediate_siblings(self):
+        self.assertEqual([node.position() for node in self.x.find('elem_a + elem_x')], [1, 7])
+        self.assertEqual([node.position() for node in self.x.find('elem_x + elem_x')], [2])
+        self.assertEqual([node.position() for node in self.x.find('status + status')], [5])
+        self.assertEqual(len(self.x.find('created_at + id')), 2)
+        self.assertEqual(len(self.x.find('status > created_at + user > created_at')), 1)
+
+    def test_any_siblings(self):
+        self.assertEqual([node.position() for node in self.x.find('elem_a ~ elem_x')], [1, 2, 7])
+        self.assertEqual([node.position() for node in self.x.find('elem_x ~ elem_a')], [3, 6])
+        self.assertEqual([node.position() for node in self.x.find('elem_x + elem_a ~ status')], [4, 5, 8])
+        self.assertEqual(len(self.x.find('created_at ~ user lang')), 1)
+        self.assertEqual(len(self.x.find('status ~ elem_a ~ elem_x')), 1)
+
+    def test_children(self):
+        self.assertEqual([node.position() for node in self.x.children('elem_a + elem_x')], [1, 7])
+        self.assertEqual(len(self.x.children('created_at + id')), 0)
+
+    def test_with_index(self):
+        expected = [node.position() for node in self.x.find('elem_a ~ elem_x')]
+
+        self.x.build_index()
+
+        self.assertEqual([node.position() for node in self.x.find('elem_a ~ elem_x')], expected)
+
+    def test_leading_sibling_combinator(self):
+        with self.assertRaises(InvalidSelectorError):
+            self.x.find('+ status')
+
+        with self.assertRaises(InvalidSelectorError):
+            self.x.ifind('~ status')
+
+    def test_linear_on_wide_parent(self):
+        root = Kotoba(XMLDriver(parseString('<r>{}<a/></r>'.format('<b/>' * 20000)).documentElement))
+
+        root.children()
+
+        started_at = time.perf_counter()
+
+        self.assertEqual(len(root.find('a ~ b')), 0)
+        self.assertEqual(len(root.find('b ~ a')), 1)
+        self.assertEqual(len(root.find('b ~ b')), 19999)
+
+        self.assertLess(time.perf_counter() - started_at, 5)
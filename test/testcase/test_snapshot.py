@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from kotoba           import load_from_file
+from kotoba.driver    import SnapshotDriver
+from kotoba.exception import InvalidInputError
+from kotoba.snapshot  import Snapshot
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.path      = os.path.join(self.cache_dir, 'sandbox.xml')
+
+        shutil.copy(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'), self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def load(self):
+        return load_from_file(self.path, cache=True, cache_dir=self.cache_dir)
+
+    def snapshots(self):
+        return [name for name in os.listdir(self.cache_dir) if name.endswith('.ktbs')]
+
+    def test_same_result_as_dom(self):
+        document = load_from_file(self.path)
+
+        for x in (self.load(), self.load()): # a miss, then a hit
+            self.assertIsInstance(x.node(), SnapshotDriver)
+            self.assertEqual(x.name(), document.name())
+
+            for selector in ['created_at', 'status > user', 'status lang', 'user[id]', 'status']:
+                expected = [(node.name(), node.attributes(), node.data()) for node in document.find(selector)]
+                actual   = [(node.name(), dict(node.attributes()), node.data()) for node in x.find(selector)]
+
+                self.assertEqual(actual, expected, selector)
+
+        self.assertEqual(len(self.snapshots()), 1)
+
+    def test_hit_does_not_parse(self):
+        self.load()
+
+        with open(os.path.join(self.cache_dir, self.snapshots()[0]), 'rb') as f:
+            snapshot = Snapshot(f.read())
+
+        self.assertEqual(snapshot.name(0), self.load().name())
+        self.assertEqual(snapshot.ends[0], snapshot.size - 1)
+
+    def test_stale_snapshot(self):
+        self.assertNotEqual(self.load().find('mode').data(), 'changed')
+
+        with open(self.path) as f:
+            content = f.read()
+
+        with open(self.path, 'w') as f:
+            f.write(content.replace('<created_at>', '<mode>changed</mode><created_at>', 1))
+
+        self.assertEqual(self.load().find('mode').data(), 'changed')
+
+    def test_touched_file(self):
+        expected = self.load().data()
+        stat     = os.stat(self.path)
+
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual(self.load().data(), expected)
+
+    def test_corrupt_snapshot(self):
+        expected = self.load().data()
+        path     = os.path.join(self.cache_dir, self.snapshots()[0])
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        for corrupt in (data[:len(data) // 2], data[:100], data[:70], data[:-1]):
+            with open(path, 'wb') as f:
+                f.write(corrupt)
+
+            self.assertEqual(self.load().data(), expected)
+
+    def test_unusable_cache_dir(self):
+        expected = load_from_file(self.path).data()
+
+        for cache_dir in (os.devnull, os.path.join(os.devnull, 'kotoba')):
+            self.assertEqual(load_from_file(self.path, cache=True, cache_dir=cache_dir).data(), expected)
+
+    def test_untrusted_cache_dir(self):
+        expected = load_from_file(self.path).data()
+
+        os.chmod(self.cache_dir, 0o777)
+
+        self.assertEqual(self.load().data(), expected)
+        self.assertEqual(self.snapshots(), [])
+
+    def test_default_cache_dir(self):
+        variables = dict(os.environ)
+
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.cache_dir, 'home')
+
+        try:
+            self.assertEqual(load_from_file(self.path, cache=True).data(), load_from_file(self.path).data())
+
+            cache_dir = os.path.join(self.cache_dir, 'home', 'kotoba')
+
+            self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+        finally:
+            os.environ.clear()
+            os.environ.update(variables)
+
+    def test_unsupported(self):
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.path, mode='stream', cache=True)
+
+        with self.assertRaises(InvalidInputError):
+            load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox_document.json'), cache=True)
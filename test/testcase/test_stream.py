@@ -0,0 +1,130 @@
+import os
+import types
+
+from unittest import TestCase
+
+from kotoba           import load_from_file, misc
+from kotoba.common    import set_trace
+from kotoba.exception import InvalidInputError, InvalidSelectorError
+from kotoba.kotoba    import Kotoba
+from kotoba.stream    import XMLStream
+
+class TestStream(TestCase):
+    def setUp(self):
+        self.sandbox_path = os.path.join(os.path.dirname(__file__), '../data/sandbox.xml')
+        self.locator_path = os.path.join(os.path.dirname(__file__), '../data/locator.xml')
+
+        self.x = load_from_file(self.sandbox_path, mode='stream')
+        self.y = load_from_file(self.locator_path, mode='stream')
+
+    def test_loading(self):
+        self.assertIsInstance(self.x, XMLStream)
+        self.assertIsInstance(self.x.find('created_at'), types.GeneratorType)
+
+    def test_same_result_as_dom(self):
+        document = load_from_file(self.sandbox_path)
+
+        for selector in ['created_at', 'status created_at', 'user created_at', 'status > created_at', 'status lang', 'status > lang', 'status']:
+            expected = [node.data() for node in document.find(selector)]
+            actual   = [node.data() for node in self.x.find(selector)]
+
+            self.assertEqual(actual, expected, selector)
+
+    def test_nested_matches(self):
+        nodes = list(self.x.find('status *'))
+
+        self.assertEqual(len(nodes), 9)
+        self.assertEqual(nodes[2].name(), 'user')
+        self.assertEqual(nodes[3].name(), 'created_at')
+
+        nodes = list(self.x.find('*'))
+
+        self.assertEqual([node.name() for node in nodes][:5], ['elem_a', 'elem_x', 'elem_x', 'elem_a', 'status'])
+        self.assertTrue(all(isinstance(node, Kotoba) for node in nodes))
+
+    def test_attributes(self):
+        nodes = list(self.y.find('entity[id=poo]'))
+
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual(nodes[0].data(), 'python soup')
+        self.assertIsNone(nodes[0].parent())
+
+        nodes = list(self.y.find('entity[id="poow-1"] > param'))
+
+        self.assertEqual([node.attribute('name') for node in nodes], ['a', 'b', 'do_multiply'])
+
+    def test_early_exit(self):
+        self.assertEqual(next(self.y.find('param')).data(), '2')
+
+    def test_unsupported(self):
+        with self.assertRaises(InvalidSelectorError):
+            list(self.x.find('elem_a + elem_x'))
+
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.sandbox_path, mode='unknown')
+
+class TestPartialLoading(TestCase):
+    def setUp(self):
+        self.sandbox_path = os.path.join(os.path.dirname(__file__), '../data/sandbox.xml')
+        self.document     = load_from_file(self.sandbox_path)
+
+    def test_same_result_as_dom(self):
+        for selector in ['created_at', 'status > user', 'user created_at', 'status lang', 'status']:
+            x = load_from_file(self.sandbox_path, only=selector)
+
+            self.assertIsInstance(x, Kotoba)
+            self.assertEqual(x.name(), self.document.name())
+
+            expected = [(node.attributes(), node.data()) for node in self.document.find(selector)]
+            actual   = [(node.attributes(), node.data()) for node in x.find(selector)]
+
+            self.assertEqual(actual, expected, selector)
+
+    def test_only_matching_subtrees(self):
+        x = load_from_file(self.sandbox_path, only='user > created_at')
+
+        self.assertEqual([node.name() for node in x.children()], ['status', 'status'])
+        self.assertEqual(len(x.find('*')), 6)
+        self.assertEqual(len(x.find('user > created_at')), 2)
+        self.assertEqual(x.find('user > created_at').data(), self.document.find('user > created_at').data())
+
+        for selector in ['elem_a', 'elem_x', 'id', 'lang', 'status > created_at']:
+            self.assertEqual(len(x.find(selector)), 0, selector)
+
+        for node in x.find('user > created_at'):
+            self.assertEqual(node.parent().name(), 'user')
+            self.assertEqual(node.parent().parent().name(), 'status')
+
+    def test_unreachable_subtrees_are_skipped(self):
+        tested = []
+
+        set_trace(lambda event, node, details: tested.append(node.name()) if event == 'match' else None)
+
+        try:
+            x = load_from_file(self.sandbox_path, only='> status > id')
+        finally:
+            set_trace(None)
+
+            misc.debug_mode = False
+
+        self.assertEqual([node.name() for node in x.find('*')], ['status', 'id'])
+        self.assertIn('user', tested)
+        self.assertNotIn('lang', tested) # below a <user>, which "id" cannot be in
+
+    def test_selector_from_the_document_element(self):
+        for selector, below in [('statuses > status > user', 'status > user'), ('statuses[type=array] created_at', 'created_at')]:
+            x = load_from_file(self.sandbox_path, only=selector)
+
+            self.assertEqual(
+                [(node.attributes(), node.data()) for node in x.find(below)],
+                [(node.attributes(), node.data()) for node in self.document.find(below)],
+            )
+
+        self.assertEqual(len(load_from_file(self.sandbox_path, only='statuses[type=other] > status').find('status')), 0)
+
+    def test_unsupported(self):
+        with self.assertRaises(InvalidSelectorError):
+            load_from_file(self.sandbox_path, only='status + status')
+
+        with self.assertRaises(InvalidInputError):
+            load_from_file(self.sandbox_path, driver='etree', only='status')
@@ -0,0 +1,38 @@
+import types
+
+from unittest import TestCase
+
+from kotoba.kotoba import Kotoba
+
+class TestText(TestCase):
+    def setUp(self):
+        self.x = Kotoba('<p>Hello, <b>big <i>bold</i></b> world<br/>!</p>')
+
+    def test_iter_text(self):
+        self.assertIsInstance(self.x.iter_text(), types.GeneratorType)
+        self.assertEqual(list(self.x.iter_text()), ['Hello, ', 'big ', 'bold', ' world', '!'])
+
+    def test_data(self):
+        self.assertEqual(self.x.data(), 'Hello, big bold world!')
+        self.assertEqual(self.x.find('b')[0].data(), 'big bold')
+
+    def test_max_chars(self):
+        self.assertEqual(self.x.data(max_chars=9), 'Hello, bi')
+        self.assertEqual(self.x.data(max_chars=100), 'Hello, big bold world!')
+        self.assertIsNone(self.x._data) # the truncated text is not cached.
+
+        self.x.data()
+
+        self.assertEqual(self.x.data(max_chars=5), 'Hello')
+
+    def test_empty_text_is_cached(self):
+        node = self.x.find('br')[0]
+
+        self.assertEqual(node.data(), '')
+        self.assertEqual(node._data, '')
+
+    def test_deep_document(self):
+        depth = 2000
+        x     = Kotoba('{}text{}'.format('<a>' * depth, '</a>' * depth))
+
+        self.assertEqual(x.data(), 'text')
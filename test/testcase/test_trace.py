@@ -0,0 +1,66 @@
+import logging
+import os
+
+from threading import Thread
+from unittest  import TestCase
+
+from kotoba        import load_from_file, misc
+from kotoba.common import set_trace
+
+class TestTrace(TestCase):
+    def setUp(self):
+        self.x = load_from_file(os.path.join(os.path.dirname(__file__), '../data/sandbox.xml'))
+
+    def tearDown(self):
+        set_trace(None)
+
+        misc.debug_mode = False
+
+    def test_disabled_by_default(self):
+        self.assertFalse(misc.debug_mode)
+
+    def test_handler(self):
+        events = []
+
+        set_trace(lambda event, node, details: events.append((event, node, details)))
+
+        self.assertTrue(misc.debug_mode)
+
+        nodes = self.x.find('status > user')
+
+        self.assertEqual(events[0][0], 'search')
+        self.assertIs(events[0][1], self.x)
+
+        matches = [details['selector'].name() for event, node, details in events if event == 'match']
+
+        self.assertIn('user', matches)
+        self.assertEqual(len(nodes), 2)
+
+        set_trace(None)
+        events.clear()
+
+        self.x.find('status > user')
+
+        self.assertFalse(misc.debug_mode)
+        self.assertEqual(events, [])
+
+    def test_logging(self):
+        misc.debug_mode = True
+
+        with self.assertLogs('kotoba', logging.DEBUG) as logs:
+            self.x.find('status > user')
+
+        self.assertIn('DEBUG:kotoba:  [SELECTOR/MATCHING] status --> status', logs.output)
+
+    def test_handler_using_the_node(self):
+        data = []
+
+        set_trace(lambda event, node, details: data.append(node.data()) if event == 'initialize' else None)
+
+        thread = Thread(target=self.x.find, args=('status > user',), daemon=True)
+
+        thread.start()
+        thread.join(10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(data)
@@ -0,0 +1,84 @@
+import sys
+import time
+
+from unittest        import TestCase
+from xml.dom.minidom import parseString
+
+from kotoba.driver import XMLDriver
+from kotoba.kotoba import Kotoba, Kami
+from kotoba.parser import compile_selector
+
+def from_string(xml):
+    return Kotoba(XMLDriver(parseString(xml).documentElement))
+
+class TestTraversal(TestCase):
+    def test_deep_document(self):
+        depth = sys.getrecursionlimit() * 2
+        root  = from_string('<n>' * depth + '<leaf/>' + '</n>' * depth)
+
+        nodes = root.find('leaf')
+
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual(nodes[0].level(), depth)
+        self.assertEqual(len(root.find('n n leaf')), 1)
+
+    def test_failing_chain_in_deep_document(self):
+        # Each descendant step used to backtrack over every ancestor, taking minutes.
+        depth = 400
+        root  = from_string('<n>' * depth + '<leaf/>' + '</n>' * depth)
+        start = time.perf_counter()
+
+        self.assertEqual(len(root.find('x n n n leaf')), 0)
+        self.assertEqual(len(root.find('n x n n leaf')), 0)
+        self.assertEqual(len(root.find('n n n leaf')), 1)
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_document_order(self):
+        root  = from_string('<r><a id="1"><b id="2"><a id="3"/></b></a><b id="4"/></r>')
+        nodes = root.find('*')
+
+        self.assertEqual([node.attribute('id') for node in nodes], ['1', '2', '3', '4'])
+
+    def test_nested_partial_matches(self):
+        root = from_string('<r><a id="1"><x><a id="2"><b id="3"><c id="4"/></b></a></x></a></r>')
+
+        self.assertEqual([node.attribute('id') for node in root.find('a > b')], ['3'])
+        self.assertEqual([node.attribute('id') for node in root.find('a > b c')], ['4'])
+        self.assertEqual([node.attribute('id') for node in root.find('a a')], ['2'])
+        self.assertEqual([node.attribute('id') for node in root.find('> a')], ['1'])
+        self.assertEqual([node.attribute('id') for node in root.find('> a > a')], [])
+
+    def test_children_with_selector(self):
+        root = from_string('<r><a id="1"><a id="2"/></a><b id="3"/></r>')
+
+        self.assertEqual([node.attribute('id') for node in root.children('a')], ['1'])
+        self.assertEqual(len(root.children('a a')), 0)
+
+    def test_ifind(self):
+        root     = from_string('<r><a id="1"/><a id="2"/><b><a id="3"/></b></r>')
+        iterator = root.ifind('a')
+
+        self.assertNotIsInstance(iterator, Kami)
+        self.assertEqual(next(iterator).attribute('id'), '1')
+        self.assertEqual([node.attribute('id') for node in iterator], ['2', '3'])
+
+    def test_ifind_stops_early(self):
+        root  = from_string('<r><a id="1"/><b><c/></b></r>')
+        first = next(root.ifind('a'))
+
+        self.assertEqual(first.attribute('id'), '1')
+        self.assertFalse(root.children()[1]._is_children_initialized)
+
+    def test_strategies_agree(self):
+        root = from_string(
+            '<r><a id="1"><b id="2"><c id="3"><a id="4"><c id="5"><b id="6"/></c></a></c></b></a>'
+            '<c id="7"><a id="8"><b id="9"><c id="10"/></b></a></c></r>'
+        )
+
+        for raw_selector in ['a b c', 'a c b', 'c a b c', 'a > b c', 'a b > c', 'c a > b', 'r a b', 'a b c a c b']:
+            selector = compile_selector(raw_selector)
+            expected = [node.attribute('id') for node in root._iter_descendants(selector)]
+            actual   = [node.attribute('id') for node in root._verify(selector.chain(), root._iter_elements())]
+
+            self.assertEqual(actual, expected, raw_selector)
+            self.assertEqual([node.attribute('id') for node in root.find(raw_selector)], expected, raw_selector)